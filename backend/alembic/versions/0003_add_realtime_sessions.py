@@ -0,0 +1,49 @@
+"""Add realtime_sessions registry table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[Sequence[str], None] = None
+depends_on: Union[Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "realtime_sessions",
+        sa.Column("session_id", sa.String(length=255), nullable=False),
+        sa.Column("owner", sa.String(length=255), nullable=False),
+        sa.Column("claim_id", sa.String(length=32), nullable=False, server_default=""),
+        sa.Column("key_hash", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("stats", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "heartbeat_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("session_id"),
+    )
+    op.create_index(
+        "ix_realtime_sessions_heartbeat_at", "realtime_sessions", ["heartbeat_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_realtime_sessions_heartbeat_at", table_name="realtime_sessions")
+    op.drop_table("realtime_sessions")
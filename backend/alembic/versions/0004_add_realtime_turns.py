@@ -0,0 +1,44 @@
+"""Add realtime_turns table for persisted live transcripts
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[Sequence[str], None] = None
+depends_on: Union[Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "realtime_turns",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("session_id", sa.String(length=255), nullable=False),
+        sa.Column("key_hash", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("turn_index", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("speaker_label", sa.String(length=100), nullable=False, server_default=""),
+        sa.Column("start_ms", sa.Integer(), nullable=False),
+        sa.Column("end_ms", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("session_id", "turn_index"),
+    )
+    op.create_index("ix_realtime_turns_created_at", "realtime_turns", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_realtime_turns_created_at", table_name="realtime_turns")
+    op.drop_table("realtime_turns")
@@ -2,7 +2,8 @@ import json
 import os
 from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException
 from service.assembly_ai.core import AssemblyAIService
-from models.assemblyai import CreateTranscriptResponse, TranscriptUtterance
+from service.realtime.capture import capture_store
+from models.assemblyai import CreateTranscriptResponse, TranscriptFromSessionRequest, TranscriptUtterance
 
 assembly_ai_router = APIRouter()
 service = AssemblyAIService()
@@ -73,3 +74,47 @@ async def create_transcript(
             except Exception as e:
                 # Log the error but don't raise it since we've already processed the file
                 print(f"Warning: Could not delete temporary file {temp_file_path}: {e}")
+
+
+@assembly_ai_router.post("/createTranscriptFromSession", response_model=CreateTranscriptResponse, status_code=200)
+async def create_transcript_from_session(
+    request: TranscriptFromSessionRequest,
+    x_assemblyai_key: str = Header(..., description="The AssemblyAI API key"),
+):
+    """Create a batch transcript from audio captured during a realtime session.
+
+    Replaces the post-meeting upload to `/createTranscript` when the
+    `/ws/realtime` session was started with `"capture_audio": true`. The
+    capture can only be used with the AssemblyAI key that recorded it and
+    is deleted once transcribed (or after `REALTIME_CAPTURE_TTL_SECONDS`).
+    """
+    if not x_assemblyai_key or not x_assemblyai_key.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="AssemblyAI API key is required. Provide it via the X-AssemblyAI-Key header."
+        )
+
+    if capture_store.is_recording(request.session_id):
+        raise HTTPException(status_code=409, detail="Session is still recording")
+
+    captured = capture_store.get(request.session_id, x_assemblyai_key)
+    if captured is None:
+        raise HTTPException(status_code=404, detail="No captured audio for this session")
+
+    try:
+        transcript_text, utterances_data = await service.get_transcript(
+            path_to_file=captured.path,
+            api_key=x_assemblyai_key,
+            lang_code=request.lang_code,
+            min_speaker=request.min_speaker,
+            max_speaker=request.max_speaker,
+            keyterms_prompt=request.keyterms_prompt,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing audio file: {str(e)}")
+
+    capture_store.discard(request.session_id)
+    return CreateTranscriptResponse(
+        transcript=transcript_text,
+        utterances=[TranscriptUtterance(**u) for u in utterances_data],
+    )
@@ -1,13 +1,17 @@
 import asyncio
 import json
+from typing import Callable
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 
-from models.chatbot import ChatRequest, ChatResponse
+from models.chatbot import (
+    ChatRequest, ChatResponse, ChatSessionCreateRequest, ChatSessionInfo, ChatSessionTurnRequest)
 from models.llm import TokenUsage
 from service.chatbot.core import ChatbotService
+from service.chatbot.sessions import MAX_SESSION_MESSAGES, ChatSession, StaleContextError, chat_sessions
 from service.realtime.core import RealtimeTranscriptionService
+from service.realtime.delta import PROTOCOL_VERSION_DELTA, PartialDeltaEncoder, negotiate_protocol
 from utils.logging import logger
 
 chatbot_router = APIRouter(prefix="/chatbot")
@@ -18,6 +22,83 @@ realtime_service = RealtimeTranscriptionService()
 @chatbot_router.post("/chat", response_model=ChatResponse, status_code=200)
 async def chat(request: ChatRequest):
     """Chat with the AI assistant. Supports streaming."""
+    return await _chat_response(request)
+
+
+@chatbot_router.post("/sessions", response_model=ChatSessionInfo, status_code=201)
+async def create_chat_session(request: ChatSessionCreateRequest):
+    """Create a server-side chat session (optionally seeded with an existing conversation).
+
+    Turns then go to ``POST /chatbot/sessions/{id}/chat`` with only the new
+    message and changed context.
+    """
+    session = chat_sessions.create()
+    chat_sessions.update_context(
+        session, request.app_context, request.app_context_version,
+        request.transcript, request.transcript_version)
+    session.messages = request.messages[-MAX_SESSION_MESSAGES:]
+    return _session_info(session)
+
+
+@chatbot_router.get("/sessions/{session_id}", response_model=ChatSessionInfo)
+async def get_chat_session(session_id: str):
+    """Return the size and stored context versions of a chat session."""
+    return _session_info(_get_session(session_id))
+
+
+@chatbot_router.delete("/sessions/{session_id}", status_code=204)
+async def delete_chat_session(session_id: str):
+    """Discard a chat session (e.g. when the user clears the chat)."""
+    if not chat_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+
+
+@chatbot_router.post("/sessions/{session_id}/chat", response_model=ChatResponse, status_code=200)
+async def chat_in_session(session_id: str, request: ChatSessionTurnRequest):
+    """Chat within a server-side session. Same response format as ``/chat``.
+
+    The stored history, app context and transcript are used; the request
+    carries the new message plus context deltas. 404 means the session
+    expired (recreate it), 409 that a referenced context version is not
+    stored (resend that context in full).
+    """
+    session = _get_session(session_id)
+    try:
+        chat_sessions.update_context(
+            session, request.app_context, request.app_context_version,
+            request.transcript, request.transcript_version)
+    except StaleContextError as e:
+        raise HTTPException(status_code=409, detail=f"Stale {e}: resend it in full")
+    base_length = len(session.messages)
+    chat_request = chat_sessions.chat_request(session, request)
+    message = chat_request.messages[-1]
+    return await _chat_response(
+        chat_request, on_reply=lambda reply: chat_sessions.record_turn(session, base_length, message, reply))
+
+
+def _get_session(session_id: str) -> ChatSession:
+    session = chat_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return session
+
+
+def _session_info(session: ChatSession) -> ChatSessionInfo:
+    return ChatSessionInfo(
+        session_id=session.id,
+        messages=len(session.messages),
+        app_context_version=session.app_context_version,
+        transcript_version=session.transcript_version,
+        ttl_seconds=chat_sessions.ttl_seconds,
+    )
+
+
+async def _chat_response(request: ChatRequest, on_reply: Callable[[str], None] | None = None):
+    """Run one chat turn and map provider errors to HTTP errors.
+
+    ``on_reply`` receives the complete reply text once it has been fully
+    generated (streamed to the end without a mid-stream error).
+    """
     try:
         result = await service.chat(request)
         if request.stream:
@@ -30,13 +111,19 @@ async def chat(request: ChatRequest):
                 return StreamingResponse(iter([]), media_type="text/plain")
 
             async def _with_first():
+                chunks = [first_chunk]
                 yield first_chunk
                 async for chunk in gen:
+                    chunks.append(chunk)
                     yield chunk
+                if on_reply is not None and "<!--STREAM_ERROR:" not in chunks[-1]:
+                    on_reply("".join(chunks))
 
             return StreamingResponse(_with_first(), media_type="text/plain")
         else:
             output, usage = result
+            if on_reply is not None:
+                on_reply(output)
             token_usage = None
             try:
                 token_usage = TokenUsage(
@@ -72,7 +159,7 @@ async def chat(request: ChatRequest):
 @chatbot_router.get("/knowledge")
 async def knowledge_status():
     """Return the loaded status of the knowledge base."""
-    return service.get_knowledge_status()
+    return {**service.get_knowledge_status(), "sessions": chat_sessions.stats()}
 
 
 @chatbot_router.websocket("/ws/voice")
@@ -85,9 +172,11 @@ async def chatbot_voice(ws: WebSocket):
 
     Protocol:
     1. Client sends init JSON: {"api_key": "...", "sample_rate": 16000}
-    2. Server responds with {"type": "ready"}
+       (optionally "protocol_version": 2 for delta-encoded partials)
+    2. Server responds with {"type": "ready", "protocol_version": 1|2}
     3. Client sends {"type": "start"} to begin a recording session
-    4. Server connects to AssemblyAI, responds {"type": "recording"}
+    4. Server takes a pre-warmed AssemblyAI connection (or connects),
+       responds {"type": "recording"}
     5. Client sends binary audio frames, server relays and returns
        {"type": "turn", "transcript": "...", "is_final": true/false}
     6. Client sends {"type": "stop"} to end the session
@@ -107,13 +196,22 @@ async def chatbot_voice(ws: WebSocket):
 
         api_key = init_msg.get("api_key")
         sample_rate = init_msg.get("sample_rate", 16000)
+        protocol_version = negotiate_protocol(init_msg.get("protocol_version"))
+        encoder = PartialDeltaEncoder() if protocol_version >= PROTOCOL_VERSION_DELTA else None
 
         if not api_key:
             await ws.send_json({"type": "error", "message": "API key required"})
             await ws.close()
             return
 
-        await ws.send_json({"type": "ready"})
+        await ws.send_json({"type": "ready", "protocol_version": protocol_version})
+        # Open an AAI session ahead of the first "start" (keys that streamed recently only)
+        realtime_service.prewarm(api_key, sample_rate)
+
+        async def send_turn(message: dict):
+            if encoder is not None:
+                message = encoder.encode(message)
+            await ws.send_json(message)
 
         async def relay_aai_to_browser(aai_conn):
             """Relay transcript events from one AAI session to the browser."""
@@ -144,13 +242,13 @@ async def chatbot_voice(ws: WebSocket):
                             continue
 
                         if is_formatted and transcript:
-                            await ws.send_json({
+                            await send_turn({
                                 "type": "turn",
                                 "transcript": transcript,
                                 "is_final": True,
                             })
                         elif not is_eos and transcript:
-                            await ws.send_json({
+                            await send_turn({
                                 "type": "turn",
                                 "transcript": transcript,
                                 "is_final": False,
@@ -212,8 +310,10 @@ async def chatbot_voice(ws: WebSocket):
                 if cmd == "start":
                     # Stop any lingering session first
                     await stop_session()
+                    if encoder is not None:
+                        encoder.reset()
                     try:
-                        aai_ws = await realtime_service.connect(api_key, sample_rate)
+                        aai_ws, _ = await realtime_service.acquire(api_key, sample_rate)
                         aai_relay_task = asyncio.create_task(
                             relay_aai_to_browser(aai_ws)
                         )
@@ -1,67 +1,54 @@
 import asyncio
 import json
+from dataclasses import asdict
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Body, HTTPException, WebSocket, WebSocketDisconnect
-from langdetect import LangDetectException, detect
-from pydantic_ai import Agent
-from pydantic_ai.settings import ModelSettings
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 
+from config import config
+from db.models import User
+from dependencies.auth import require_admin
 from models.llm import TokenUsage
-from models.realtime import IncrementalSummaryRequest, IncrementalSummaryResponse
-from service.llm.core import LLMService
+from models.realtime import (
+    IncrementalSummaryRequest,
+    IncrementalSummaryResponse,
+    RealtimeRelayMetrics,
+    RealtimeSessionStats,
+    RealtimeTranscriptSnapshot,
+    RealtimeTranscriptTurn,
+)
+from service.realtime.broadcast import SessionBroadcast, SubscriberLimitError
+from service.realtime.capture import AudioCapture, capture_store
 from service.realtime.core import RealtimeTranscriptionService
-from service.realtime.session import SessionManager
+from service.realtime.delta import PROTOCOL_VERSION_DELTA, PartialDeltaEncoder, negotiate_protocol
+from service.realtime.metrics import RelayMetrics, relay_metrics
+from service.realtime.persistence import turn_store
+from service.realtime.registry import WORKER_ID, create_session_registry
+from service.realtime.resample import FrameChunker, StreamingResampler
+from service.realtime.ring import AudioRingBuffer
+from service.realtime.sender import BrowserSender
+from service.realtime.session import (
+    SessionAccessError,
+    SessionInUseError,
+    SessionManager,
+    TranscriptSnapshot,
+    api_key_hash,
+)
+from service.realtime.summary import IncrementalSummaryService
+from service.realtime.timer import DeadlineTimer
+from service.realtime.vad import VoiceActivityGate
 from utils.logging import logger
 
-# --- Language detection ---
-
-_LANG_CODE_MAP: dict[str, str] = {
-    "en": "English",
-    "de": "German",
-    "fr": "French",
-    "es": "Spanish",
-    "it": "Italian",
-    "pt": "Portuguese",
-    "nl": "Dutch",
-    "pl": "Polish",
-    "ru": "Russian",
-    "ja": "Japanese",
-    "ko": "Korean",
-    "ar": "Arabic",
-    "tr": "Turkish",
-    "sv": "Swedish",
-    "da": "Danish",
-    "fi": "Finnish",
-    "cs": "Czech",
-    "sk": "Slovak",
-    "hu": "Hungarian",
-    "ro": "Romanian",
-    "uk": "Ukrainian",
-    "zh-cn": "Chinese",
-    "zh-tw": "Chinese (Traditional)",
-}
-
-
-def _detect_language_sync(text: str) -> str:
-    try:
-        code = detect(text)
-        return _LANG_CODE_MAP.get(code, "English")
-    except LangDetectException:
-        return "English"
-
-
-async def _detect_language(text: str) -> str:
-    return await asyncio.to_thread(_detect_language_sync, text)
-
-
 realtime_router = APIRouter()
 service = RealtimeTranscriptionService()
-session_manager = SessionManager()
-llm_service = LLMService()
+session_manager = SessionManager(create_session_registry(), turn_store)
+summary_service = IncrementalSummaryService()
 
 MAX_RECONNECT_ATTEMPTS = 3
 RECONNECT_BASE_DELAY = 1  # seconds
+FINAL_DEBOUNCE_DELAY = 0.3  # seconds
+AUDIO_FRAME_MS = 50  # size of audio frames sent to AAI (live when normalized, and on replay)
 
 
 @realtime_router.post(
@@ -72,51 +59,29 @@ RECONNECT_BASE_DELAY = 1  # seconds
 async def create_incremental_summary(
     request: IncrementalSummaryRequest = Body(...),
 ):
-    """Generate or update a summary incrementally from a realtime transcript."""
+    """Generate or update a summary incrementally from a realtime transcript. Supports streaming."""
     try:
-        from models.llm import LLMProvider
-
-        model_name = request.model
-        if request.provider == LLMProvider.AZURE_OPENAI and request.azure_config:
-            model_name = request.azure_config.deployment_name
-
-        model = llm_service._create_model(
-            provider=request.provider,
-            model_name=model_name,
-            api_key=request.api_key,
-            azure_config=request.azure_config,
-            langdock_config=request.langdock_config,
-        )
+        if request.stream:
+            generator = await summary_service.generate(request)
+            # Eagerly fetch the first chunk to catch connection/auth errors
+            # before committing to a 200 StreamingResponse.
+            gen = generator.__aiter__()
+            try:
+                first_chunk = await gen.__anext__()
+            except StopAsyncIteration:
+                return StreamingResponse(iter([]), media_type="text/plain")
 
-        # Detect language from the transcript; substitute {language} in the prompt
-        language = await _detect_language(request.full_transcript)
-        system_prompt = request.system_prompt.replace("{language}", language)
+            async def _with_first():
+                yield first_chunk
+                async for chunk in gen:
+                    yield chunk
 
-        # Build user prompt based on mode
-        if request.is_full_recompute or request.previous_summary is None:
-            user_prompt = (
-                f"Create a structured summary of the following transcript:\n\n"
-                f"{request.full_transcript}"
-            )
-        else:
-            user_prompt = (
-                f"Current summary:\n{request.previous_summary}\n\n"
-                f"New transcript (only update sections directly relevant to this):\n"
-                f"{request.new_transcript_chunk}\n\n"
-                f"Update the summary. Preserve all unchanged sections verbatim."
-            )
+            return StreamingResponse(_with_first(), media_type="text/plain")
 
-        agent = Agent(
-            model,
-            system_prompt=system_prompt,
-            model_settings=ModelSettings(temperature=0.1),
-        )
-
-        result = await agent.run(user_prompt)
+        summary_title, output, usage, unchanged = await summary_service.generate(request)
 
         token_usage = None
         try:
-            usage = result.usage()
             token_usage = TokenUsage(
                 input_tokens=usage.request_tokens or 0,
                 output_tokens=usage.response_tokens or 0,
@@ -125,20 +90,11 @@ async def create_incremental_summary(
         except Exception:
             pass
 
-        # Generate dedicated title via structured output
-        summary_title = None
-        try:
-            summary_title, _ = await llm_service._generate_title(
-                model, request.provider, model_name,
-                request.full_transcript, language, None,
-            )
-        except Exception as e:
-            logger.warning(f"Realtime title generation failed: {e}")
-
         return IncrementalSummaryResponse(
-            summary=result.output,
+            summary=output,
             summary_title=summary_title,
             updated_at=datetime.now(timezone.utc).isoformat(),
+            unchanged=unchanged,
             usage=token_usage,
         )
 
@@ -165,23 +121,145 @@ async def create_incremental_summary(
         )
 
 
+@realtime_router.get(
+    "/realtime/sessions/{session_id}/stats",
+    status_code=200,
+    response_model=RealtimeSessionStats,
+)
+async def get_session_stats(
+    session_id: str,
+    x_assemblyai_key: str | None = Header(None, description="The AssemblyAI API key that streams the session"),
+    x_viewer_token: str | None = Header(None, description="The session's viewer token (owning worker only)"),
+):
+    """Return outbound queue statistics for an active realtime session.
+
+    Sessions owned by another worker are answered from the stats snapshot
+    the owner last published to the session registry. Like the transcript,
+    stats are only shown to the AssemblyAI key that streams the session or
+    to holders of its viewer token; anyone else gets 404.
+    """
+    if not (x_assemblyai_key and x_assemblyai_key.strip()) and not x_viewer_token:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide the AssemblyAI API key (X-AssemblyAI-Key) or the session's viewer token (X-Viewer-Token)."
+        )
+    session = await session_manager.get_session(session_id)
+    if session is not None:
+        if not session.can_view(x_viewer_token, x_assemblyai_key):
+            raise HTTPException(status_code=404, detail="Session not found")
+        stats = _session_stats(session.sender, session.vad, session.broadcast, session.metrics)
+        return RealtimeSessionStats(session_id=session_id, owner=WORKER_ID, **stats)
+    record = await session_manager.lookup(session_id)
+    if record is None or not x_assemblyai_key or api_key_hash(x_assemblyai_key) != record.key_hash:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return RealtimeSessionStats(session_id=session_id, owner=record.owner, stale=True, **record.stats)
+
+
+@realtime_router.get(
+    "/realtime/metrics",
+    status_code=200,
+    response_model=RealtimeRelayMetrics,
+)
+async def get_relay_metrics(_: User = Depends(require_admin)):
+    """Aggregate relay telemetry of this worker: live sessions plus totals since start.
+
+    Meant for capacity planning (sessions per host): throughput, event
+    latency and debounce histograms, dropped partials and reconnects.
+    Admins only.
+    """
+    return RealtimeRelayMetrics(worker=WORKER_ID, **relay_metrics.snapshot())
+
+
+@realtime_router.get(
+    "/realtime/sessions/{session_id}/transcript",
+    status_code=200,
+    response_model=RealtimeTranscriptSnapshot,
+)
+async def get_session_transcript(
+    session_id: str,
+    from_turn: int = Query(0, ge=0, description="Only return turns with this index or later"),
+    x_assemblyai_key: str = Header(..., description="The AssemblyAI API key that streamed the session"),
+):
+    """Return a session's final turns (with timestamps and speakers) and current partial.
+
+    Lets a client that reloaded mid-session rebuild its view without
+    re-uploading anything. Ended sessions and sessions owned by another
+    worker are served from persisted turns when REALTIME_PERSIST_TURNS is on.
+    Only the AssemblyAI key that streamed the session can read it.
+    """
+    if not x_assemblyai_key or not x_assemblyai_key.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="AssemblyAI API key is required. Provide it via the X-AssemblyAI-Key header."
+        )
+    snapshot = await _transcript_snapshot(session_id, api_key_hash(x_assemblyai_key), from_turn)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return snapshot
+
+
+async def _transcript_snapshot(session_id: str, key_hash: str, from_turn: int) -> RealtimeTranscriptSnapshot | None:
+    snapshot = await session_manager.snapshot(session_id, key_hash, from_turn)
+    if snapshot is None:
+        return None
+    return _snapshot_response(session_id, from_turn, snapshot)
+
+
+def _snapshot_response(session_id: str, from_turn: int, snapshot: TranscriptSnapshot) -> RealtimeTranscriptSnapshot:
+    return RealtimeTranscriptSnapshot(
+        session_id=session_id,
+        live=snapshot.live,
+        from_turn=from_turn,
+        next_turn=snapshot.next_turn,
+        turns=[RealtimeTranscriptTurn(**asdict(t)) for t in snapshot.turns],
+        current_partial=snapshot.current_partial,
+    )
+
+
+def _session_stats(
+    sender: BrowserSender | None, vad: VoiceActivityGate | None,
+    broadcast: SessionBroadcast | None = None, metrics: RelayMetrics | None = None,
+) -> dict:
+    stats = sender.stats() if sender else {}
+    if vad:
+        stats.update(vad.stats(), vad_enabled=True)
+    if broadcast:
+        stats.update(broadcast.stats())
+    if metrics:
+        stats["metrics"] = metrics.to_dict()
+    return stats
+
+
 @realtime_router.websocket("/ws/realtime")
 async def realtime_transcription(ws: WebSocket):
     await ws.accept()
 
     aai_ws = None
     session_id = None
+    session = None
+    capture = None
 
     try:
         # Step 1: Receive init message with api_key and session_id
         init_raw = await ws.receive_text()
         init_msg = json.loads(init_raw)
 
+        if init_msg.get("subscribe"):
+            # Read-only viewer of a session another connection is streaming
+            await _run_subscriber(ws, init_msg)
+            return
+
         api_key = init_msg.get("api_key")
         session_id = init_msg.get("session_id")
         sample_rate = init_msg.get("sample_rate", 16000)
+        # Audio is resampled to this rate before it reaches AAI (0 = as sent)
+        aai_sample_rate = config.realtime_target_sample_rate or sample_rate
         speech_model = init_msg.get("speech_model", "precise")
         keyterms_prompt = init_msg.get("keyterms_prompt", [])
+        max_partials_per_second = _partial_rate(init_msg.get("max_partials_per_second"))
+        protocol_version = negotiate_protocol(init_msg.get("protocol_version"))
+        capture_audio = bool(init_msg.get("capture_audio", False))
+        vad_enabled = bool(init_msg.get("vad", False))
 
         if not api_key or not session_id:
             await ws.send_json({"type": "error", "message": "api_key and session_id are required"})
@@ -189,12 +267,17 @@ async def realtime_transcription(ws: WebSocket):
             return
 
         # Step 2: Create session
-        await session_manager.create_session(session_id)
+        try:
+            session = await session_manager.create_session(session_id, api_key_hash(api_key))
+        except (SessionInUseError, SessionAccessError) as e:
+            await ws.send_json({"type": "error", "message": str(e)})
+            await ws.close()
+            return
 
         # Step 3: Connect to AssemblyAI
         try:
-            aai_ws = await service.connect(
-                api_key, sample_rate, speech_model,
+            aai_ws, pooled = await service.acquire(
+                api_key, aai_sample_rate, speech_model,
                 keyterms_prompt=keyterms_prompt if keyterms_prompt else None,
             )
         except Exception as e:
@@ -203,16 +286,36 @@ async def realtime_transcription(ws: WebSocket):
                 await ws.send_json({"type": "error", "message": "Invalid AssemblyAI API key"})
             else:
                 await ws.send_json({"type": "error", "message": f"Failed to connect to AssemblyAI: {e}"})
-            await session_manager.remove_session(session_id)
             await ws.close()
             return
 
         # Step 4: Notify browser
-        await ws.send_json({"type": "session_started", "session_id": session_id})
+        await ws.send_json({
+            "type": "session_started",
+            "session_id": session_id,
+            "protocol_version": protocol_version,
+            "capture_audio": capture_audio,
+            "vad": vad_enabled,
+            "resumed_turns": len(session.turns),
+            "viewer_token": session.viewer_token,
+        })
+        if pooled:
+            # Begin was consumed while the connection sat in the pool
+            await ws.send_json({"type": "session_ready"})
         logger.info(f"Realtime session started: {session_id}")
 
         # Step 5: Run concurrent relay tasks
-        await _run_relay(ws, aai_ws, session_id, api_key, sample_rate, speech_model)
+        if capture_audio:
+            capture = capture_store.begin(session_id, sample_rate)
+            capture.start()
+        await _run_relay(
+            ws, aai_ws, session_id, api_key, aai_sample_rate, speech_model,
+            max_partials_per_second=max_partials_per_second,
+            protocol_version=protocol_version,
+            capture=capture,
+            vad_enabled=vad_enabled,
+            input_sample_rate=sample_rate if config.realtime_target_sample_rate else None,
+        )
 
     except WebSocketDisconnect:
         logger.info(f"Browser disconnected for session {session_id}")
@@ -229,8 +332,10 @@ async def realtime_transcription(ws: WebSocket):
                 await service.terminate(aai_ws)
             except Exception:
                 pass
-        if session_id:
-            await session_manager.remove_session(session_id)
+        if capture:
+            await capture_store.finish(session_id, capture, api_key)
+        if session:
+            await session_manager.remove_session(session)
             logger.info(f"Realtime session cleaned up: {session_id}")
         try:
             await ws.send_json({"type": "session_ended"})
@@ -238,6 +343,105 @@ async def realtime_transcription(ws: WebSocket):
             pass
 
 
+async def _run_subscriber(ws: WebSocket, init_msg: dict):
+    """Follow a live session read-only.
+
+    The viewer first receives a snapshot of the transcript so far, then the
+    same turn/partial/control messages as the streaming connection, through
+    its own bounded queue. Audio sent by a subscriber is ignored. Only the
+    worker that owns the session can serve its subscribers, and only to
+    viewers presenting the session's ``viewer_token`` or the owner's
+    ``api_key``.
+    """
+    session_id = init_msg.get("session_id")
+    if not session_id:
+        await ws.send_json({"type": "error", "message": "session_id is required"})
+        return
+
+    session = await session_manager.get_session(session_id)
+    if session is not None and not session.can_view(init_msg.get("viewer_token"), init_msg.get("api_key")):
+        # Same answer as for unknown sessions, so ids cannot be probed
+        await ws.send_json({"type": "error", "message": "Session not found"})
+        return
+    if session is None or session.broadcast is None:
+        record = await session_manager.lookup(session_id)
+        if record is not None and record.owner != WORKER_ID:
+            message = f"Session {session_id} is live on another worker ({record.owner})"
+        else:
+            message = "Session not found"
+        await ws.send_json({"type": "error", "message": message})
+        return
+
+    protocol_version = negotiate_protocol(init_msg.get("protocol_version"))
+    from_turn = _from_turn(init_msg.get("from_turn"))
+    sender = BrowserSender(
+        ws,
+        max_queue=config.realtime_outbound_queue_size,
+        max_partials_per_second=_partial_rate(init_msg.get("max_partials_per_second")),
+        encoder=PartialDeltaEncoder() if protocol_version >= PROTOCOL_VERSION_DELTA else None,
+    )
+    await ws.send_json({
+        "type": "session_started",
+        "session_id": session_id,
+        "protocol_version": protocol_version,
+        "subscriber": True,
+    })
+
+    # No await between snapshot and subscribe: finals already in the
+    # snapshot are skipped, later ones arrive live.
+    snapshot = session.snapshot(from_turn)
+    try:
+        subscriber = session.broadcast.subscribe(sender, snapshot.next_turn)
+    except SubscriberLimitError as e:
+        await ws.send_json({"type": "error", "message": str(e)})
+        return
+    sender.start()
+    sender.send({"type": "snapshot", **_snapshot_response(session_id, from_turn, snapshot).model_dump()})
+    logger.info(f"Subscriber joined realtime session {session_id}")
+
+    async def receive_control():
+        try:
+            while True:
+                message = await ws.receive()
+                if message.get("type") == "websocket.disconnect":
+                    return
+                if not message.get("text"):
+                    continue
+                data = json.loads(message["text"])
+                if data.get("type") == "stop":
+                    return
+                if data.get("type") == "resume":
+                    resumed = await _transcript_snapshot(
+                        session_id, session.key_hash, _from_turn(data.get("from_turn")))
+                    if resumed is not None:
+                        sender.send({"type": "snapshot", **resumed.model_dump()})
+        except Exception:
+            return
+
+    task_control = asyncio.create_task(receive_control())
+    task_done = asyncio.create_task(subscriber.done.wait())
+    try:
+        await asyncio.wait([task_control, task_done], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        task_control.cancel()
+        task_done.cancel()
+        session.broadcast.unsubscribe(subscriber)
+        if subscriber.reason == "lagging":
+            # Queued messages are stale; the viewer reconnects and resyncs
+            await sender.close(timeout=0)
+            logger.info(f"Evicted lagging subscriber from realtime session {session_id}")
+            try:
+                await ws.send_json({
+                    "type": "error",
+                    "message": "Fell too far behind the live session, reconnect to catch up",
+                })
+            except Exception:
+                pass
+        else:
+            await sender.close()
+            logger.info(f"Subscriber left realtime session {session_id}")
+
+
 async def _run_relay(
     ws: WebSocket,
     aai_ws,
@@ -245,12 +449,85 @@ async def _run_relay(
     api_key: str,
     sample_rate: int,
     speech_model: str = "precise",
+    max_partials_per_second: float = 0,
+    protocol_version: int = 1,
+    capture: AudioCapture | None = None,
+    vad_enabled: bool = False,
+    input_sample_rate: int | None = None,
 ):
     stop_event = asyncio.Event()
+    key_hash = api_key_hash(api_key)
+    metrics = relay_metrics.start()
+    sender = BrowserSender(
+        ws,
+        max_queue=config.realtime_outbound_queue_size,
+        max_partials_per_second=max_partials_per_second,
+        encoder=PartialDeltaEncoder() if protocol_version >= PROTOCOL_VERSION_DELTA else None,
+        metrics=metrics,
+    )
+    metrics.sender = sender
+    sender.start()
+    await session_manager.attach_sender(session_id, sender)
+    await session_manager.attach_metrics(session_id, metrics)
+    # Everything the relay emits also reaches the session's subscribers;
+    # replies meant for this connection only go through sender directly.
+    broadcast = SessionBroadcast(
+        sender,
+        max_subscribers=config.realtime_max_subscribers,
+        max_queue=config.realtime_outbound_queue_size,
+    )
+    await session_manager.attach_broadcast(session_id, broadcast)
+
+    # Recent audio is kept so it can be replayed to a new AAI connection.
+    # Positions are absolute byte offsets into the session's PCM stream.
+    bytes_per_ms = sample_rate * 2 / 1000
+    audio = AudioRingBuffer(int(sample_rate * config.realtime_replay_buffer_seconds) * 2)
+    frame_bytes = int(sample_rate * AUDIO_FRAME_MS / 1000) * 2
+    # A resumed session continues after its restored turns
+    session = await session_manager.get_session(session_id)
+    resume_offset_ms = session.resumed_offset_ms if session else 0
+
+    sent_pos = 0        # audio delivered to the current AAI connection
+    conn_base_pos = 0   # where the current AAI connection's audio starts
+    reconnecting = False
+
+    # Optional silence gate: positions above are then on the gated timeline
+    vad = None
+    if vad_enabled:
+        vad = VoiceActivityGate(
+            sample_rate,
+            threshold_dbfs=config.realtime_vad_threshold_dbfs,
+            hangover_ms=config.realtime_vad_hangover_ms,
+            preroll_ms=config.realtime_vad_preroll_ms,
+        )
+        await session_manager.attach_vad(session_id, vad)
+
+    # Frame normalization: browser audio at any rate and frame size becomes
+    # fixed AUDIO_FRAME_MS frames at sample_rate (the rate AAI was opened with)
+    resampler = chunker = None
+    if input_sample_rate:
+        resampler = StreamingResampler(input_sample_rate, sample_rate)
+        chunker = FrameChunker(frame_bytes)
+
+    def prepare_audio(pcm: bytes) -> list[bytes]:
+        """Normalize and gate one browser frame; returns the frames to forward."""
+        chunks = chunker.push(resampler.process(pcm)) if chunker else (pcm,)
+        if vad is None:
+            return list(chunks)
+        frames = []
+        for chunk in chunks:
+            frames.extend(vad.process(chunk))
+        return frames
 
     async def browser_to_aai():
-        """Receive audio/control messages from browser and forward to AAI."""
-        nonlocal aai_ws
+        """Receive audio/control messages from browser and forward to AAI.
+
+        Audio is always written to the ring buffer first. While AAI is
+        reconnecting frames are only buffered; aai_to_browser replays them
+        once the new connection is up. Sends still in flight on a replaced
+        connection neither advance ``sent_pos`` nor restart reconnecting.
+        """
+        nonlocal aai_ws, sent_pos, reconnecting
         try:
             while not stop_event.is_set():
                 message = await ws.receive()
@@ -261,18 +538,40 @@ async def _run_relay(
 
                 if "bytes" in message and message["bytes"]:
                     # Binary audio frame
+                    metrics.record_audio(message["bytes"])
+                    if capture is not None:
+                        capture.write(message["bytes"])
+                    frames = prepare_audio(message["bytes"])
+                    for frame in frames:
+                        audio.write(frame)
+                    if reconnecting:
+                        continue
+                    conn = aai_ws
                     try:
-                        await service.send_audio(aai_ws, message["bytes"])
+                        for frame in frames:
+                            await service.send_audio(conn, frame)
+                            if reconnecting or aai_ws is not conn:
+                                # aai_to_browser took over during the send;
+                                # its replay resends everything from sent_pos
+                                break
+                            sent_pos += len(frame)
                     except Exception:
-                        # AAI connection lost — will be handled by aai_to_browser
-                        stop_event.set()
-                        return
+                        # AAI connection lost — aai_to_browser reconnects and
+                        # replays everything from sent_pos. A late failure on
+                        # a connection it already replaced is ignored.
+                        if aai_ws is conn:
+                            reconnecting = True
 
                 elif "text" in message and message["text"]:
                     data = json.loads(message["text"])
                     if data.get("type") == "stop":
                         stop_event.set()
                         return
+                    elif data.get("type") == "resume":
+                        snapshot = await _transcript_snapshot(
+                            session_id, key_hash, _from_turn(data.get("from_turn")))
+                        if snapshot is not None:
+                            sender.send({"type": "snapshot", **snapshot.model_dump()})
                     elif data.get("type") == "update_keyterms":
                         keyterms = data.get("keyterms_prompt", [])[:100]
                         try:
@@ -295,57 +594,83 @@ async def _run_relay(
         Progressive formatted finals from AssemblyAI are debounced so only
         the last (longest) version of each turn is sent to the frontend.
         """
-        nonlocal aai_ws
+        nonlocal aai_ws, sent_pos, conn_base_pos, reconnecting
         pending_final: str | None = None
-        pending_task: asyncio.Task | None = None
+        pending_end_ms: int | None = None  # audio-clock end of pending_final
+        pending_since = 0.0  # loop time the pending turn's first formatted final arrived
+        loop = asyncio.get_running_loop()
+        # Serializes the debounce flush with flush_now so a final is never
+        # overtaken by the partial that follows it.
+        flush_lock = asyncio.Lock()
         # Timestamp tracking
-        current_turn_start: int = 0  # start_ms for the current turn
-        last_sent_end_ms: int = 0    # end_ms of the last send_final call
+        current_turn_start: int = resume_offset_ms  # start_ms for the current turn
+        last_sent_end_ms: int = resume_offset_ms    # end_ms of the last send_final call
         last_final_text: str = ""    # text of last sent final (to detect progressive vs new)
 
         current_speaker: str = ""      # speaker label for the current turn
         last_known_speaker: str = ""   # last non-UNKNOWN speaker for fallback
 
-        async def send_final(text: str):
+        async def send_final(text: str, end_ms: int | None = None):
             """Send a finalized turn to browser and session_manager."""
             nonlocal last_sent_end_ms, last_final_text
-            await session_manager.append_final_text(session_id, text + " ")
+            if end_ms is None:
+                end_ms = await session_manager.elapsed_ms(session_id)
+            end_ms = max(end_ms, last_sent_end_ms)
+            turn = await session_manager.append_turn(session_id, text, current_speaker, current_turn_start, end_ms)
             await session_manager.update_partial(session_id, "")
-            end_ms = await session_manager.elapsed_ms(session_id)
             last_sent_end_ms = end_ms
             last_final_text = text
-            await ws.send_json({
+            broadcast.send({
                 "type": "turn",
                 "transcript": text,
                 "is_final": True,
                 "start_ms": current_turn_start,
                 "end_ms": end_ms,
                 "speaker_label": current_speaker,
+                "turn_index": turn.index if turn else None,
             })
 
-        async def delayed_flush():
-            """Sleep then send the buffered final."""
+        async def flush_pending():
+            """Send the buffered final, if any (debounce timer callback)."""
             nonlocal pending_final
-            await asyncio.sleep(0.3)
-            text = pending_final
-            if text is not None:
-                pending_final = None
-                await send_final(text)
+            async with flush_lock:
+                text = pending_final
+                if text is not None:
+                    pending_final = None
+                    await send_final(text, pending_end_ms)
+                    metrics.debounce_delay.observe((loop.time() - pending_since) * 1000)
 
         async def flush_now():
-            """Immediately flush any pending final and cancel the timer."""
-            nonlocal pending_final, pending_task
-            if pending_task and not pending_task.done():
-                pending_task.cancel()
-                try:
-                    await pending_task
-                except asyncio.CancelledError:
-                    pass
-                pending_task = None
-            if pending_final is not None:
-                text = pending_final
-                pending_final = None
-                await send_final(text)
+            """Immediately flush any pending final and disarm the timer."""
+            flush_timer.cancel()
+            await flush_pending()
+
+        async def replay_buffered():
+            """Send audio buffered since the connection was lost to the new one."""
+            nonlocal sent_pos, conn_base_pos, reconnecting
+            pos = sent_pos
+            if pos < audio.start:
+                logger.warning(
+                    f"Session {session_id}: {int((audio.start - pos) / bytes_per_ms)} ms of audio "
+                    f"exceeded the replay buffer and were lost")
+                pos = audio.start
+            conn_base_pos = pos
+            replayed = 0
+            # Frames keep arriving while we send; loop until caught up.
+            while pos < audio.end:
+                if pos < audio.start:
+                    pos = audio.start
+                chunk = audio.read(pos, frame_bytes)
+                await service.send_audio(aai_ws, chunk)
+                pos += len(chunk)
+                replayed += len(chunk)
+            sent_pos = pos
+            reconnecting = False
+            if replayed:
+                logger.info(f"Session {session_id}: replayed {int(replayed / bytes_per_ms)} ms of buffered audio")
+
+        flush_timer = DeadlineTimer(flush_pending)
+        flush_timer.start()
 
         try:
             while not stop_event.is_set():
@@ -354,16 +679,26 @@ async def _run_relay(
                 except Exception as e:
                     if stop_event.is_set():
                         break
-                    # Attempt reconnect
+                    # Attempt reconnect; browser_to_aai buffers audio meanwhile
                     logger.warning(f"AAI connection lost: {e}")
+                    reconnecting = True
+                    lost_at = loop.time()
                     reconnected = await _attempt_reconnect(
-                        ws, api_key, sample_rate, session_id, speech_model
+                        broadcast, api_key, sample_rate, session_id, speech_model, metrics=metrics,
                     )
                     if reconnected:
                         aai_ws = reconnected
+                        try:
+                            await replay_buffered()
+                        except Exception as replay_error:
+                            # Surfaces again on the next recv and retries
+                            logger.warning(f"Audio replay failed: {replay_error}")
+                        metrics.reconnects += 1
+                        metrics.reconnect_seconds += loop.time() - lost_at
                         continue
                     else:
-                        await ws.send_json({
+                        metrics.reconnect_seconds += loop.time() - lost_at
+                        broadcast.send({
                             "type": "error",
                             "message": "Lost connection to AssemblyAI and reconnect failed"
                         })
@@ -401,35 +736,40 @@ async def _run_relay(
 
                     if is_formatted and transcript:
                         # Progressive final — buffer and reset debounce timer
-                        if pending_task and not pending_task.done():
-                            pending_task.cancel()
                         # Detect new turn: if text doesn't extend previous, advance start
                         if last_final_text and not transcript.startswith(last_final_text):
                             current_turn_start = last_sent_end_ms
+                        if pending_final is None:
+                            pending_since = loop.time()
                         pending_final = transcript
+                        pending_end_ms = _audio_end_ms(event, conn_base_pos / bytes_per_ms)
+                        if pending_end_ms is not None:
+                            if vad is not None:
+                                pending_end_ms = vad.to_session_ms(pending_end_ms)
+                            pending_end_ms += resume_offset_ms
                         current_speaker = resolved_speaker
 
                         # Immediately send as partial so the user sees live text
                         await session_manager.update_partial(session_id, transcript)
-                        await ws.send_json({
+                        broadcast.send_partial({
                             "type": "turn",
                             "transcript": transcript,
                             "is_final": False,
                             "speaker_label": resolved_speaker,
                         })
-                        pending_task = asyncio.create_task(delayed_flush())
+                        flush_timer.arm(FINAL_DEBOUNCE_DELAY)
                     elif not is_eos and transcript:
                         # Unformatted partial — send as live preview
                         await flush_now()
                         await session_manager.update_partial(session_id, transcript)
-                        await ws.send_json({
+                        broadcast.send_partial({
                             "type": "turn",
                             "transcript": transcript,
                             "is_final": False,
                             "speaker_label": resolved_speaker,
-                        })
+                        }, throttle=True)
                 else:
-                    await _handle_aai_event(ws, event, session_id)
+                    await _handle_aai_event(broadcast, event, session_id)
 
         except Exception as e:
             if not stop_event.is_set():
@@ -437,16 +777,48 @@ async def _run_relay(
                 stop_event.set()
         finally:
             # Flush any remaining pending final before exiting
-            if pending_task and not pending_task.done():
-                pending_task.cancel()
+            await flush_timer.stop()
             if pending_final is not None:
                 try:
-                    await send_final(pending_final)
+                    await send_final(pending_final, pending_end_ms)
                 except Exception:
                     pass
 
+    async def send_tail():
+        """Forward audio still held by the resampler and chunker before AAI is terminated."""
+        nonlocal sent_pos
+        if chunker is None:
+            return
+        frames = chunker.push(resampler.flush())
+        rest = chunker.flush()
+        if rest:
+            # Padded with silence: AAI rejects frames shorter than 50 ms
+            frames.append(rest + bytes(frame_bytes - len(rest)))
+        if vad is not None:
+            frames = [out for frame in frames for out in vad.process(frame)]
+        for frame in frames:
+            audio.write(frame)
+        if reconnecting:
+            return
+        try:
+            for frame in frames:
+                await service.send_audio(aai_ws, frame)
+                sent_pos += len(frame)
+        except Exception as e:
+            logger.debug(f"Session {session_id}: could not send final audio: {e}")
+
+    async def publish_heartbeat():
+        """Keep this worker's registry record alive for lookups from other workers."""
+        while True:
+            await asyncio.sleep(config.realtime_registry_heartbeat_seconds)
+            try:
+                await session_manager.heartbeat(session_id, _session_stats(sender, vad, broadcast, metrics))
+            except Exception as e:
+                logger.warning(f"Session registry heartbeat failed for {session_id}: {e}")
+
     task_b2a = asyncio.create_task(browser_to_aai())
     task_a2b = asyncio.create_task(aai_to_browser())
+    task_heartbeat = asyncio.create_task(publish_heartbeat())
 
     try:
         _, pending = await asyncio.wait(
@@ -460,13 +832,61 @@ async def _run_relay(
                 await task
             except (asyncio.CancelledError, Exception):
                 pass
+        await send_tail()
     except Exception:
         stop_event.set()
         task_b2a.cancel()
         task_a2b.cancel()
+    finally:
+        task_heartbeat.cancel()
+        broadcast.close()
+        await sender.close()
+        relay_metrics.finish(metrics)
+        if vad is not None:
+            vad_stats = vad.stats()
+            logger.info(
+                f"Session {session_id}: VAD gated {vad_stats['gated_audio_ms']} of "
+                f"{vad_stats['audio_ms']} ms of audio")
+        if sender.dropped_partials:
+            logger.info(
+                f"Session {session_id}: dropped {sender.dropped_partials} superseded partial(s), "
+                f"max outbound queue depth {sender.max_queue_depth}")
+
+
+def _audio_end_ms(event: dict, base_ms: float) -> int | None:
+    """End of a Turn on the session's audio clock.
+
+    AssemblyAI word timestamps are relative to the start of the audio sent
+    on the current connection; ``base_ms`` is where that audio starts in the
+    session, so turns stay continuous across reconnects.
+    """
+    words = event.get("words") or []
+    end = words[-1].get("end") if words else None
+    if end is None:
+        return None
+    return int(base_ms + end)
+
+
+def _from_turn(requested) -> int:
+    try:
+        return max(int(requested or 0), 0)
+    except (TypeError, ValueError):
+        return 0
 
 
-async def _handle_aai_event(ws: WebSocket, event: dict, session_id: str):
+def _partial_rate(requested) -> float:
+    """Resolve the per-session partial rate limit, capped by the server setting."""
+    cap = config.realtime_max_partials_per_second
+    try:
+        rate = float(requested) if requested is not None else cap
+    except (TypeError, ValueError):
+        rate = cap
+    if cap > 0 and (rate <= 0 or rate > cap):
+        return cap
+    return max(rate, 0)
+
+
+async def _handle_aai_event(sender: BrowserSender | SessionBroadcast, event: dict, session_id: str):
     """Parse non-Turn AAI events and forward to browser.
 
     Turn events are handled directly in aai_to_browser() with debouncing.
@@ -476,32 +896,34 @@ async def _handle_aai_event(ws: WebSocket, event: dict, session_id: str):
     if msg_type == "Error":
         error_msg = event.get("error", "Unknown AssemblyAI error")
         logger.error(f"AAI error for session {session_id}: {error_msg}")
-        await ws.send_json({"type": "error", "message": error_msg})
+        sender.send({"type": "error", "message": error_msg})
 
     elif msg_type == "Begin":
         logger.info(f"AAI session confirmed for {session_id}")
-        await ws.send_json({"type": "session_ready"})
+        sender.send({"type": "session_ready"})
 
     elif msg_type == "Termination":
         logger.info(f"AAI session terminated for {session_id}")
 
 
 async def _attempt_reconnect(
-    ws: WebSocket,
+    sender: BrowserSender | SessionBroadcast,
     api_key: str,
     sample_rate: int,
     session_id: str,
     speech_model: str = "precise",
+    metrics: RelayMetrics | None = None,
 ):
     """Attempt to reconnect to AAI with exponential backoff."""
     for attempt in range(1, MAX_RECONNECT_ATTEMPTS + 1):
+        if metrics is not None:
+            metrics.reconnect_attempts += 1
         delay = RECONNECT_BASE_DELAY * (2 ** (attempt - 1))
         logger.info(
             f"Reconnect attempt {attempt}/{MAX_RECONNECT_ATTEMPTS} in {delay}s for session {session_id}")
 
-        try:
-            await ws.send_json({"type": "reconnecting", "attempt": attempt})
-        except Exception:
+        sender.send({"type": "reconnecting", "attempt": attempt})
+        if sender.failed:
             return None
 
         await asyncio.sleep(delay)
@@ -0,0 +1,74 @@
+"""Micro-benchmark: debounce of progressive formatted finals in the realtime relay.
+
+Compares the previous approach (cancel + ``asyncio.create_task`` per event)
+with the long-lived ``DeadlineTimer`` used by ``aai_to_browser``. Reports
+debounced events per second on a single core (one event loop).
+
+Run from ``backend/``:
+    uv run python -m benchmarks.bench_debounce [--events 200000]
+"""
+import argparse
+import asyncio
+import time
+
+from service.realtime.timer import DeadlineTimer
+
+DEBOUNCE_DELAY = 0.3
+
+
+async def _bench_task_per_event(events: int) -> tuple[float, int]:
+    flushed = 0
+    pending: asyncio.Task | None = None
+
+    async def delayed_flush():
+        nonlocal flushed
+        await asyncio.sleep(DEBOUNCE_DELAY)
+        flushed += 1
+
+    start = time.perf_counter()
+    for _ in range(events):
+        if pending and not pending.done():
+            pending.cancel()
+        pending = asyncio.create_task(delayed_flush())
+        # Let the event loop run, as it would between two AAI messages.
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await pending
+    return elapsed, flushed
+
+
+async def _bench_deadline_timer(events: int) -> tuple[float, int]:
+    flushed = 0
+
+    async def flush():
+        nonlocal flushed
+        flushed += 1
+
+    timer = DeadlineTimer(flush)
+    timer.start()
+    start = time.perf_counter()
+    for _ in range(events):
+        timer.arm(DEBOUNCE_DELAY)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(DEBOUNCE_DELAY * 1.5)
+    await timer.stop()
+    return elapsed, flushed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for name, bench in (
+        ("task per event (before)", _bench_task_per_event),
+        ("DeadlineTimer (after)", _bench_deadline_timer),
+    ):
+        elapsed, flushed = asyncio.run(bench(args.events))
+        print(f"{name:<26} {args.events / elapsed:>12,.0f} events/s  "
+              f"({elapsed:.2f}s, {flushed} flush)")
+
+
+if __name__ == "__main__":
+    main()
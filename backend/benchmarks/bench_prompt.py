@@ -0,0 +1,75 @@
+"""Micro-benchmark: chatbot system prompt assembly.
+
+Times ``ChatbotService._build_system_prompt`` for a realistic request
+(app context with templates, keyterms and changelog) across the feature
+flag combinations, after a warm-up call so one-time work (knowledge base
+indexing, cached static sections) is excluded. Also checks that the
+static prefix of the prompt is identical across users with the same flags,
+which is what provider-side prompt caching needs.
+
+Run from ``backend/``:
+    uv run python -m benchmarks.bench_prompt [--iterations 2000]
+"""
+import argparse
+import itertools
+import os
+import time
+
+from models.chatbot import AppContext, ChatRequest, KeytermsListInfo, PromptTemplateInfo
+from service.chatbot.core import ChatbotService
+
+
+def _request(qa: bool, transcript: bool, actions: bool, user: int = 0) -> ChatRequest:
+    context = AppContext(
+        selected_provider="openai",
+        selected_model="gpt-4.1",
+        app_mode="standard",
+        theme="dark",
+        app_version="1.0.0",
+        user_timestamp=f"2026-01-0{user + 1}T10:00:00",
+        display_name=f"User {user}",
+        changelog="## 1.0.0\n- Initial release\n" * 20,
+        custom_templates=[
+            PromptTemplateInfo(id=f"t{i}", name=f"Template {i}", content="Summarize the meeting. " * 40)
+            for i in range(5)
+        ],
+        keyterms_lists=[KeytermsListInfo(id="k1", name="Product", terms=[f"term{i}" for i in range(50)])],
+    )
+    return ChatRequest(
+        messages=[{"role": "user", "content": "How do I export my settings with a QR code?"}],
+        provider="openai",
+        model="gpt-4.1",
+        api_key="sk-test",
+        qa_enabled=qa,
+        transcript_enabled=transcript,
+        actions_enabled=actions,
+        transcript="Speaker A: Let's review the roadmap.\nSpeaker B: Sounds good.\n" * 50,
+        app_context=context,
+    )
+
+
+def _common_prefix(a: str, b: str) -> int:
+    return len(os.path.commonprefix([a, b]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="prompt builds per flag combination")
+    args = parser.parse_args()
+
+    service = ChatbotService()
+    print(f"{'qa':>5} {'transcript':>10} {'actions':>7}  {'us/build':>9}  {'prompt chars':>12}  {'shared prefix':>13}")
+    for qa, transcript, actions in itertools.product((False, True), repeat=3):
+        request = _request(qa, transcript, actions)
+        prompt = service._build_system_prompt(request)  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            service._build_system_prompt(request)
+        per_build = (time.perf_counter() - start) / args.iterations
+        other_user = service._build_system_prompt(_request(qa, transcript, actions, user=1))
+        print(f"{qa!s:>5} {transcript!s:>10} {actions!s:>7}  {per_build * 1e6:>9.1f}  {len(prompt):>12,}  "
+              f"{_common_prefix(prompt, other_user):>13,}")
+
+
+if __name__ == "__main__":
+    main()
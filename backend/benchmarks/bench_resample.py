@@ -0,0 +1,58 @@
+"""Micro-benchmark: CPU cost of realtime audio normalization per session.
+
+Feeds synthetic speech-band audio through ``StreamingResampler`` +
+``FrameChunker`` (what ``/ws/realtime`` does per browser frame) and
+reports CPU seconds per second of audio, i.e. the fraction of one core a
+single session needs, for common browser capture rates.
+
+Run from ``backend/``:
+    uv run python -m benchmarks.bench_resample [--seconds 60] [--frame-ms 85]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from service.realtime.resample import FrameChunker, StreamingResampler
+
+TARGET_RATE = 16000
+FRAME_MS = 50
+
+
+def _synthetic_audio(rate: int, seconds: float) -> bytes:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    signal = 6000 * np.sin(2 * np.pi * 220 * t) + 2000 * np.sin(2 * np.pi * 1800 * t)
+    signal += rng.normal(0, 300, len(t))
+    return np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+
+
+def _bench(rate: int, seconds: float, frame_ms: float) -> float:
+    pcm = _synthetic_audio(rate, seconds)
+    frame_bytes = int(rate * frame_ms / 1000) * 2
+    resampler = StreamingResampler(rate, TARGET_RATE)
+    chunker = FrameChunker(int(TARGET_RATE * FRAME_MS / 1000) * 2)
+
+    start = time.process_time()
+    for i in range(0, len(pcm), frame_bytes):
+        chunker.push(resampler.process(pcm[i:i + frame_bytes]))
+    return time.process_time() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio per run")
+    parser.add_argument("--frame-ms", type=float, default=85.0,
+                        help="browser frame size (4096 samples at 48 kHz is ~85 ms)")
+    args = parser.parse_args()
+
+    for rate in (48000, 44100, 16000):
+        cpu = _bench(rate, args.seconds, args.frame_ms)
+        per_second = cpu / args.seconds
+        sessions = 1 / per_second if per_second else float("inf")
+        print(f"{rate:>6} Hz -> {TARGET_RATE} Hz  {per_second * 1000:>7.3f} ms CPU per session-second  "
+              f"(~{sessions:,.0f} sessions per core)")
+
+
+if __name__ == "__main__":
+    main()
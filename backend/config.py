@@ -45,6 +45,202 @@ class Settings(BaseSettings):
         description="Comma-separated list of admin emails to seed on startup"
     )
 
+    # --- Realtime Settings ---
+    realtime_segment_chars: int = Field(
+        default=12000,
+        ge=1000,
+        description="Target size (characters) of closed transcript segments for hierarchical realtime summaries"
+    )
+
+    realtime_segment_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of transcript segments summarized concurrently"
+    )
+
+    realtime_outbound_queue_size: int = Field(
+        default=256,
+        ge=1,
+        description="Maximum queued outbound messages per realtime session before partials are dropped"
+    )
+
+    realtime_max_partials_per_second: float = Field(
+        default=10.0,
+        ge=0,
+        description="Upper bound for unformatted partial transcripts sent per second per session (0 = unlimited)"
+    )
+
+    realtime_pool_size: int = Field(
+        default=0,
+        ge=0,
+        description="Pre-warmed idle AssemblyAI streaming connections kept per recently active API key, sample rate and model (0 = disabled)"
+    )
+
+    realtime_pool_idle_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Seconds an unused pre-warmed AssemblyAI connection is kept open before it is closed"
+    )
+
+    realtime_replay_buffer_seconds: float = Field(
+        default=15.0,
+        ge=1,
+        description="Seconds of recent audio kept per realtime session and replayed to AssemblyAI after a reconnect"
+    )
+
+    realtime_capture_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Seconds captured realtime audio is kept for /createTranscriptFromSession before it is deleted"
+    )
+
+    realtime_target_sample_rate: int = Field(
+        default=16000,
+        ge=0,
+        description="Sample rate realtime audio is resampled to (and re-chunked into fixed frames) before it is sent to AssemblyAI (0 = forward as received)"
+    )
+
+    realtime_vad_threshold_dbfs: float = Field(
+        default=-50.0,
+        le=0,
+        description="Level (dBFS per 10 ms window) at which the optional realtime VAD gate treats audio as speech"
+    )
+
+    realtime_vad_hangover_ms: int = Field(
+        default=1500,
+        ge=0,
+        description="Audio forwarded after the last speech frame before the VAD gate closes (keeps end-of-turn silence)"
+    )
+
+    realtime_vad_preroll_ms: int = Field(
+        default=300,
+        ge=0,
+        description="Gated audio released in front of a speech onset so word beginnings are not clipped"
+    )
+
+    realtime_session_registry: str = Field(
+        default="memory",
+        description="Where realtime session ownership is tracked: 'memory' (single worker) or 'postgres' (shared across workers, needs DATABASE_URL)"
+    )
+
+    realtime_registry_heartbeat_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        description="How often a worker refreshes its realtime sessions in the registry; records older than 3 heartbeats are considered dead"
+    )
+
+    realtime_persist_turns: bool = Field(
+        default=False,
+        description="Persist finalized realtime turns to Postgres so sessions survive reconnects and restarts (needs DATABASE_URL)"
+    )
+
+    realtime_persist_interval_seconds: float = Field(
+        default=3.0,
+        gt=0,
+        description="Maximum delay before queued realtime turns are written in one batch"
+    )
+
+    realtime_persist_batch_size: int = Field(
+        default=50,
+        ge=1,
+        description="Number of queued realtime turns that triggers an immediate batch write"
+    )
+
+    realtime_persist_retention_hours: float = Field(
+        default=24.0,
+        gt=0,
+        description="Persisted realtime turns older than this are deleted"
+    )
+
+    realtime_max_subscribers: int = Field(
+        default=20,
+        ge=0,
+        description="Maximum read-only viewers per live realtime session (0 = subscribing disabled)"
+    )
+
+    # --- Chatbot Settings ---
+    chatbot_kb_retrieval: bool = Field(
+        default=True,
+        description="Inject only the usage guide sections relevant to the conversation instead of the whole guide"
+    )
+
+    chatbot_kb_top_k: int = Field(
+        default=6,
+        ge=1,
+        description="Maximum number of usage guide sections injected per chatbot turn"
+    )
+
+    chatbot_kb_token_budget: int = Field(
+        default=6000,
+        ge=500,
+        description="Approximate token budget for usage guide sections injected per chatbot turn"
+    )
+
+    chatbot_transcript_retrieval_tokens: int = Field(
+        default=12000,
+        ge=0,
+        description="Transcripts longer than this (approximate tokens) are injected as an overview plus the passages relevant to the conversation (0 = always inject in full)"
+    )
+
+    chatbot_transcript_token_budget: int = Field(
+        default=8000,
+        ge=500,
+        description="Approximate token budget for transcript passages injected per chatbot turn"
+    )
+
+    chatbot_history_token_budget: int = Field(
+        default=6000,
+        ge=500,
+        description="Approximate token budget for chat history sent verbatim; older messages are summarized"
+    )
+
+    chatbot_history_summary: bool = Field(
+        default=True,
+        description="Summarize chat history beyond the token budget in the background (uses the user's LLM)"
+    )
+
+    chatbot_session_ttl_seconds: int = Field(
+        default=1800,
+        ge=60,
+        description="Server-side chatbot sessions idle for longer than this are discarded"
+    )
+
+    chatbot_max_sessions: int = Field(
+        default=1000,
+        ge=1,
+        description="Maximum number of server-side chatbot sessions kept per worker (least recently used are dropped)"
+    )
+
+    chatbot_answer_cache: bool = Field(
+        default=False,
+        description="Replay cached answers for first-turn Q&A-only chatbot questions similar to earlier ones"
+    )
+
+    chatbot_answer_cache_size: int = Field(
+        default=1000,
+        ge=1,
+        description="Maximum number of cached chatbot answers per worker"
+    )
+
+    chatbot_answer_cache_similarity: float = Field(
+        default=0.9,
+        gt=0,
+        le=1,
+        description="Minimum cosine similarity of normalized questions for a cached chatbot answer to be reused"
+    )
+
+    # --- Key Point Extraction Settings ---
+    key_points_per_speaker: bool = Field(
+        default=False,
+        description="Extract speaker key points with one concurrent LLM call per speaker instead of one call for the whole transcript"
+    )
+
+    key_points_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum concurrent LLM calls of one per-speaker key point extraction"
+    )
+
     # --- Validation methods ---
     @field_validator("logging_level")
     @classmethod
@@ -58,5 +254,17 @@ class Settings(BaseSettings):
             )
         return level
 
+    @field_validator("realtime_session_registry")
+    @classmethod
+    def validate_realtime_session_registry(cls, v: str) -> str:
+        """Validate the realtime session registry backend."""
+        valid_backends = {"memory", "postgres"}
+        backend = v.lower()
+        if backend not in valid_backends:
+            raise ValueError(
+                f"Invalid realtime session registry '{v}'. Must be one of: {', '.join(sorted(valid_backends))}"
+            )
+        return backend
+
 
 config = Settings()
@@ -79,6 +79,15 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("DATABASE_URL not set — skipping database setup.")
     yield
+    from service.chatbot.memory import conversation_memory
+    from service.realtime.capture import capture_store
+    from service.realtime.core import connection_pool
+    from service.realtime.persistence import turn_store
+    await connection_pool.close()
+    await conversation_memory.close()
+    capture_store.clear()
+    if turn_store:
+        await turn_store.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -12,3 +12,11 @@ class CreateTranscriptResponse(BaseModel):
     transcript: str = Field(..., description="The transcript of the provided audio file", examples=[
                             "Speaker A: How are you?\nSpeaker B: I'm fine thanks"])
     utterances: list[TranscriptUtterance] = Field(default_factory=list, description="Per-utterance data with timestamps")
+
+
+class TranscriptFromSessionRequest(BaseModel):
+    session_id: str = Field(..., min_length=1, description="Realtime session whose audio was captured (init option 'capture_audio')")
+    lang_code: str | None = Field(None, description="Language code (e.g., 'en', 'de'). If not provided, language will be automatically detected")
+    min_speaker: int = Field(1, ge=1, description="Minimum number of speakers expected")
+    max_speaker: int = Field(10, le=20, description="Maximum number of speakers expected")
+    keyterms_prompt: list[str] | None = Field(None, description="Keyterms for transcription prompting")
@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from models.llm import LLMProvider, AzureConfig, LangdockConfig, TokenUsage
 
 
@@ -83,9 +83,62 @@ class ChatRequest(BaseModel):
     transcript: str | None = None
     stream: bool = True
     app_context: AppContext | None = None
+    context_tools: bool = Field(False, description="List templates, form templates, keyterms and changelog compactly and let the model fetch details via tools")
 
 
 class ChatResponse(BaseModel):
     content: str
     action: ActionProposal | None = None
     usage: TokenUsage | None = None
+
+
+class ChatSessionCreateRequest(BaseModel):
+    """Create a server-side chat session, optionally seeded with an existing conversation."""
+    messages: list[ChatMessage] = Field(default_factory=list)
+    app_context: AppContext | None = None
+    app_context_version: str | None = Field(None, max_length=128, description="Opaque client-chosen version of app_context")
+    transcript: str | None = None
+    transcript_version: str | None = Field(None, max_length=128, description="Opaque client-chosen version of transcript")
+
+    @model_validator(mode="after")
+    def validate_versions(self):
+        # A new session holds no context yet, so a version must come with its data
+        if self.app_context_version is not None and self.app_context is None:
+            raise ValueError("app_context_version requires app_context")
+        if self.transcript_version is not None and self.transcript is None:
+            raise ValueError("transcript_version requires transcript")
+        return self
+
+
+class ChatSessionInfo(BaseModel):
+    session_id: str
+    messages: int = Field(..., description="Messages stored in the session")
+    app_context_version: str | None = None
+    transcript_version: str | None = None
+    ttl_seconds: int = Field(..., description="Idle time after which the session is discarded")
+
+
+class ChatSessionTurnRequest(BaseModel):
+    """One turn of a server-side chat session: the new message plus context deltas only.
+
+    ``app_context`` is merged into the stored context: only the fields set
+    in the request replace stored ones. ``transcript`` replaces the stored
+    transcript ("" clears it). Omitted context is reused; if the client
+    sends a ``*_version`` that differs from the stored one without the
+    data, the server answers 409 and the client resends it in full.
+    """
+    message: str = Field(..., min_length=1)
+    provider: LLMProvider = Field(..., description="Which LLM provider to use")
+    model: str = Field(..., min_length=1)
+    api_key: str = Field(..., min_length=1)
+    azure_config: AzureConfig | None = None
+    langdock_config: LangdockConfig = Field(default_factory=LangdockConfig)
+    qa_enabled: bool = True
+    transcript_enabled: bool = True
+    actions_enabled: bool = True
+    context_tools: bool = False
+    stream: bool = True
+    app_context: AppContext | None = None
+    app_context_version: str | None = Field(None, max_length=128)
+    transcript: str | None = None
+    transcript_version: str | None = Field(None, max_length=128)
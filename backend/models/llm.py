@@ -65,6 +65,7 @@ class ExtractKeyPointsRequest(BaseModel):
     transcript: str = Field(..., min_length=1, description="The transcript text to extract key points from")
     speakers: list[str] = Field(..., min_length=1, description="List of speaker labels found in the transcript")
     identify_speakers: bool = Field(False, description="When True, also attempt to identify real speaker names from the transcript")
+    per_speaker: bool | None = Field(None, description="One concurrent call per speaker (their turns plus shared context) instead of a single call; defaults to KEY_POINTS_PER_SPEAKER")
 
     @model_validator(mode="after")
     def validate_azure_config(self):
@@ -1,19 +1,30 @@
+from enum import Enum
+
 from pydantic import BaseModel, Field, model_validator
 
 from models.llm import AzureConfig, LangdockConfig, LLMProvider, TokenUsage
 
 
+class IncrementalUpdateMode(str, Enum):
+    REWRITE = "rewrite"
+    PATCH = "patch"
+
+
 class IncrementalSummaryRequest(BaseModel):
     provider: LLMProvider = Field(..., description="Which LLM provider to use")
     api_key: str = Field(..., min_length=1, description="Provider API key (sent per-request)")
     model: str = Field(..., min_length=1, description="Model identifier")
     azure_config: AzureConfig | None = Field(None, description="Required only when provider is 'azure_openai'")
     langdock_config: LangdockConfig = Field(default_factory=LangdockConfig, description="Langdock region config")
+    stream: bool = Field(False, description="Whether to stream the response (same marker protocol as /createSummary)")
     system_prompt: str = Field(..., min_length=1, description="The system prompt (selected/edited template)")
     full_transcript: str = Field(..., min_length=1, description="The full accumulated transcript so far")
     previous_summary: str | None = Field(None, description="The previous summary to update incrementally")
     new_transcript_chunk: str | None = Field(None, description="New transcript text since the last summary")
     is_full_recompute: bool = Field(False, description="Whether to recompute the summary from scratch")
+    session_id: str | None = Field(None, description="Realtime session id; required for hierarchical mode")
+    hierarchical: bool = Field(False, description="Summarize closed transcript segments once (cached per session) and reduce over them on full recomputes")
+    update_mode: IncrementalUpdateMode = Field(IncrementalUpdateMode.REWRITE, description="'rewrite' re-emits the whole summary; 'patch' asks the model for section-level edits that are applied to previous_summary")
     target_language: str = Field("en", description="Output language code")
     informal_german: bool = Field(False, description="Use informal German pronouns (du/ihr instead of Sie)")
     date: str | None = Field(None, description="Meeting date for prompt context")
@@ -30,4 +41,74 @@ class IncrementalSummaryResponse(BaseModel):
     summary: str = Field(..., description="The updated AI summary")
     summary_title: str | None = Field(None, description="Dedicated summary title generated via structured output")
     updated_at: str = Field(..., description="ISO timestamp of when the summary was generated")
+    unchanged: bool = Field(False, description="True when the new chunk carried no meaningful content and the previous summary was returned as-is")
     usage: TokenUsage | None = Field(None, description="Token usage for this request")
+
+
+class RelayLatencyHistogram(BaseModel):
+    count: int = Field(0, description="Number of observations")
+    mean_ms: float = Field(0.0, description="Mean in milliseconds")
+    p50_ms: float = Field(0.0, description="Median (upper bound of its bucket, capped at max_ms)")
+    p95_ms: float = Field(0.0, description="95th percentile (upper bound of its bucket, capped at max_ms)")
+    p99_ms: float = Field(0.0, description="99th percentile (upper bound of its bucket, capped at max_ms)")
+    max_ms: float = Field(0.0, description="Largest observation in milliseconds")
+    buckets: dict[str, int] = Field(default_factory=dict, description="Observations per bucket, keyed by the bucket's upper bound in ms ('+Inf' for the last)")
+
+
+class RelaySessionMetrics(BaseModel):
+    duration_seconds: float = Field(0.0, description="Session duration (summed over sessions in totals)")
+    audio_bytes_in: int = Field(0, description="Audio bytes received from the browser")
+    audio_frames_in: int = Field(0, description="Audio frames received from the browser")
+    frames_per_second: float = Field(0.0, description="Average audio frames received per second")
+    partials_dropped: int = Field(0, description="Partials dropped, superseded or coalesced before reaching the browser")
+    reconnect_attempts: int = Field(0, description="AssemblyAI reconnect attempts")
+    reconnects: int = Field(0, description="Successful AssemblyAI reconnects")
+    reconnect_seconds: float = Field(0.0, description="Time spent between losing and restoring (or giving up on) the AssemblyAI connection")
+    event_latency: RelayLatencyHistogram = Field(default_factory=RelayLatencyHistogram, description="Time from an AssemblyAI event being queued for the browser to it being written")
+    debounce_delay: RelayLatencyHistogram = Field(default_factory=RelayLatencyHistogram, description="Time from a turn's first formatted final to the debounced final being sent")
+
+
+class RealtimeRelayMetrics(BaseModel):
+    worker: str = Field(..., description="Worker (host:pid) these metrics belong to")
+    uptime_seconds: float = Field(0.0, description="Seconds since this worker started collecting metrics")
+    process_cpu_seconds: float = Field(0.0, description="CPU time used by this worker process")
+    active_sessions: int = Field(0, description="Realtime sessions currently relayed by this worker")
+    sessions_started: int = Field(0, description="Realtime sessions relayed since start")
+    audio_bytes_per_second: float = Field(0.0, description="Current audio intake over active sessions")
+    frames_per_second: float = Field(0.0, description="Current audio frame rate over active sessions")
+    totals: RelaySessionMetrics = Field(default_factory=RelaySessionMetrics, description="All sessions since start (active and ended); rates are per session-second")
+
+
+class RealtimeSessionStats(BaseModel):
+    session_id: str = Field(..., description="Realtime session id")
+    owner: str | None = Field(None, description="Worker (host:pid) that owns the session")
+    stale: bool = Field(False, description="True when the stats are the owner's last published snapshot rather than live values from this worker")
+    queue_depth: int = Field(0, description="Messages currently waiting in the outbound browser queue")
+    max_queue_depth: int = Field(0, description="Highest outbound queue depth seen in this session")
+    sent_messages: int = Field(0, description="Messages delivered to the browser")
+    dropped_partials: int = Field(0, description="Partial transcripts dropped or superseded because the browser fell behind")
+    coalesced_partials: int = Field(0, description="Partial transcripts folded into a later one by the partial rate limit")
+    vad_enabled: bool = Field(False, description="Whether the voice activity gate is active for this session")
+    audio_ms: int = Field(0, description="Audio received from the browser (only tracked with the VAD gate)")
+    gated_audio_ms: int = Field(0, description="Silent audio the VAD gate did not forward to AssemblyAI")
+    subscribers: int = Field(0, description="Read-only viewers currently following the session")
+    evicted_subscribers: int = Field(0, description="Viewers disconnected because their outbound queue filled up")
+    metrics: RelaySessionMetrics | None = Field(None, description="Relay telemetry of the session")
+
+
+class RealtimeTranscriptTurn(BaseModel):
+    index: int = Field(..., description="Position of the turn in the session (matches turn_index on final websocket turns)")
+    text: str = Field(..., description="Final turn text")
+    speaker_label: str = Field("", description="Speaker label (empty in fast mode)")
+    start_ms: int = Field(..., description="Start time in milliseconds since session start")
+    end_ms: int = Field(..., description="End time in milliseconds since session start")
+
+
+class RealtimeTranscriptSnapshot(BaseModel):
+    session_id: str = Field(..., description="Realtime session id")
+    live: bool = Field(..., description="True when the session is active on this worker; false when served from persisted turns")
+    from_turn: int = Field(0, description="First turn index included in 'turns'")
+    next_turn: int = Field(0, description="Index the next final turn will get; pass as from_turn to fetch only newer turns")
+    turns: list[RealtimeTranscriptTurn] = Field(default_factory=list, description="Final turns from from_turn on")
+    current_partial: str = Field("", description="Text of the turn currently in progress")
+
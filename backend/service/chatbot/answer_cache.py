@@ -0,0 +1,130 @@
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from config import config
+from service.chatbot.retrieval import tokenize
+
+NON_WORD_RE = re.compile(r"[^\w\s]")
+# Questions about the asker's own settings, data or visits (matched on the normalized text)
+PERSONAL_QUESTION_RE = re.compile(
+    r"\b(?:my|mine|myself|our|ours|name|templates?|keyterms?|webhooks?|defaults?|theme"
+    r"|today|yesterday|date|since|last visit|new)\b"
+)
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, without punctuation and with collapsed whitespace."""
+    return " ".join(NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def is_personal_question(text: str) -> bool:
+    """Whether the answer may depend on the asker's personal context."""
+    return PERSONAL_QUESTION_RE.search(normalize_question(text)) is not None
+
+
+@dataclass(eq=False)
+class CachedAnswer:
+    scope: str
+    question: str  # normalized
+    terms: Counter
+    norm: float
+    answer: str
+    hits: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
+def _vector(question: str) -> tuple[Counter, float]:
+    terms = Counter(tokenize(question))
+    return terms, math.sqrt(sum(n * n for n in terms.values()))
+
+
+class AnswerCache:
+    """Answers to first-turn knowledge base questions, looked up by similarity.
+
+    Questions are normalized and compared as bags of stemmed, stopword-free
+    terms (cosine similarity), so "How do I export my settings?" and "how
+    can I export settings" share an answer while "import settings" does
+    not. Candidates come from an inverted index over the terms, so a lookup
+    only touches entries sharing a term with the question.
+
+    Entries are grouped by ``scope`` (app version plus the settings the
+    answer may depend on). Everything is dropped when the ``generation``
+    passed to ``sync()`` changes (the usage guide's modification time).
+    At most ``max_entries`` are kept (least recently used first out).
+    """
+
+    def __init__(self, max_entries: int = 1000, threshold: float = 0.9) -> None:
+        self._max_entries = max_entries
+        self.threshold = threshold
+        self._entries: OrderedDict[tuple[str, str], CachedAnswer] = OrderedDict()  # (scope, question)
+        self._postings: dict[str, set[CachedAnswer]] = {}
+        self.generation: object = None
+        self.hits = 0
+        self.misses = 0
+
+    def sync(self, generation: object) -> None:
+        """Drop all entries if the source they were generated from changed."""
+        if generation != self.generation:
+            self.invalidate()
+            self.generation = generation
+
+    def lookup(self, scope: str, question: str) -> CachedAnswer | None:
+        normalized = normalize_question(question)
+        entry = self._entries.get((scope, normalized))
+        if entry is None:
+            terms, norm = _vector(normalized)
+            best = 0.0
+            candidates = set().union(*(self._postings.get(t, ()) for t in terms)) if terms else ()
+            for candidate in candidates:
+                if candidate.scope != scope or not candidate.norm:
+                    continue
+                dot = sum(n * candidate.terms.get(t, 0) for t, n in terms.items())
+                similarity = dot / (norm * candidate.norm)
+                if similarity > best:
+                    best, entry = similarity, candidate
+            if best < self.threshold:
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.hits += 1
+        self._entries.move_to_end((entry.scope, entry.question))
+        return entry
+
+    def store(self, scope: str, question: str, answer: str) -> None:
+        normalized = normalize_question(question)
+        terms, norm = _vector(normalized)
+        if not answer.strip() or not terms:
+            return
+        self._remove(self._entries.get((scope, normalized)))
+        entry = CachedAnswer(scope=scope, question=normalized, terms=terms, norm=norm, answer=answer)
+        self._entries[(scope, normalized)] = entry
+        for term in terms:
+            self._postings.setdefault(term, set()).add(entry)
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries.values())))
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+        self._postings.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, entry: CachedAnswer | None) -> None:
+        if entry is None:
+            return
+        del self._entries[(entry.scope, entry.question)]
+        for term in entry.terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(entry)
+                if not postings:
+                    del self._postings[term]
+
+
+answer_cache = AnswerCache(config.chatbot_answer_cache_size, config.chatbot_answer_cache_similarity)
@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass
+
+from pydantic_ai import RunContext, Tool
+
+from models.chatbot import AppContext
+
+# "### v2.5.3 (2026-05-05) — Title", as rendered by the frontend
+CHANGELOG_HEADING_RE = re.compile(r"^#{2,3}\s+v?(\d+(?:\.\d+)*)\s*(?:\(([^)]*)\))?(.*)$", re.MULTILINE)
+INDEX_RELEASES = 3  # latest changelog entries named in the prompt index
+MAX_CHANGELOG_ENTRIES = 10  # entries returned by one get_changelog call
+
+
+@dataclass
+class ChangelogEntry:
+    version: str
+    date: str
+    title: str
+    text: str  # markdown including the heading line
+
+
+def parse_changelog(changelog: str) -> list[ChangelogEntry]:
+    """Split the frontend's changelog markdown into entries (newest first, as sent)."""
+    matches = list(CHANGELOG_HEADING_RE.finditer(changelog))
+    entries = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(changelog)
+        entries.append(ChangelogEntry(
+            version=match.group(1),
+            date=(match.group(2) or "").strip(),
+            title=match.group(3).strip(" —-"),
+            text=changelog[match.start():end].strip(),
+        ))
+    return entries
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+def _is_newer(entry: ChangelogEntry, since: str) -> bool:
+    """``since`` is a version ("2.4.0") or a date/timestamp ("2026-03-01", "2026-03-01T10:00")."""
+    since = since.strip().lstrip("v")
+    if re.fullmatch(r"\d+(?:\.\d+)*", since):
+        return _version_key(entry.version) > _version_key(since)
+    return bool(entry.date) and entry.date > since[:len(entry.date)]
+
+
+def context_index(ctx: AppContext) -> list[str]:
+    """Compact settings lines for the large app context parts; details are fetched with the tools."""
+    lines = []
+    if ctx.custom_templates:
+        lines.append(
+            "- Custom prompt templates (content via get_prompt_template):\n" + "\n".join(
+                f"  - ID: `{t.id}` | Name: {t.name}" for t in ctx.custom_templates))
+    if ctx.form_templates:
+        lines.append(
+            "- Custom form templates (fields via list_form_templates): " +
+            ", ".join(f"`{t.id}` {t.name}" for t in ctx.form_templates))
+    if ctx.keyterms_lists:
+        lines.append(
+            "- Keyterms lists (terms via get_keyterms_list):\n" + "\n".join(
+                f"  - ID: `{kt.id}` | Name: {kt.name} | {len(kt.terms)} terms" for kt in ctx.keyterms_lists))
+    return lines
+
+
+def changelog_index(changelog: str) -> str:
+    entries = parse_changelog(changelog)
+    if not entries:
+        return "The changelog is available via get_changelog."
+    latest = "; ".join(
+        f"v{e.version}" + (f" ({e.date})" if e.date else "") + (f" — {e.title}" if e.title else "")
+        for e in entries[:INDEX_RELEASES])
+    return (
+        f"{len(entries)} releases; latest: {latest}. Call get_changelog (optionally with `since` set to a "
+        "version or date, e.g. the user's last visit) for the list of changes."
+    )
+
+
+def get_prompt_template(ctx: RunContext[AppContext], template_id: str) -> str:
+    """Full content of one of the user's custom prompt templates.
+
+    Args:
+        template_id: The template ID from the user settings.
+    """
+    for template in ctx.deps.custom_templates or []:
+        if template.id == template_id:
+            return f"Name: {template.name}\n\n{template.content}"
+    return f"No custom prompt template with ID `{template_id}`."
+
+
+def list_form_templates(ctx: RunContext[AppContext]) -> str:
+    """The user's custom form templates with all their fields."""
+    templates = ctx.deps.form_templates or []
+    if not templates:
+        return "The user has no custom form templates."
+    lines = []
+    for t in templates:
+        lines.append(f"- ID: `{t.id}` | Name: {t.name}")
+        for f in t.fields:
+            line = f"  - {f.label} ({f.type})"
+            if f.options:
+                line += f" [{', '.join(f.options)}]"
+            if f.description:
+                line += f": {f.description}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def get_keyterms_list(ctx: RunContext[AppContext], list_id: str) -> str:
+    """All terms of one of the user's keyterms lists.
+
+    Args:
+        list_id: The keyterms list ID from the user settings.
+    """
+    for keyterms in ctx.deps.keyterms_lists or []:
+        if keyterms.id == list_id:
+            return f"Name: {keyterms.name}\nTerms: {', '.join(keyterms.terms)}"
+    return f"No keyterms list with ID `{list_id}`."
+
+
+def get_changelog(ctx: RunContext[AppContext], since: str | None = None) -> str:
+    """Changelog entries of the app, newest first.
+
+    Args:
+        since: Only entries newer than this version (e.g. "2.4.0") or date (e.g. "2026-03-01").
+            Omit for the latest entries.
+    """
+    changelog = ctx.deps.changelog or ""
+    entries = parse_changelog(changelog)
+    if not entries:
+        return changelog or "No changelog available."
+    if since:
+        entries = [e for e in entries if _is_newer(e, since)]
+        if not entries:
+            return f"No changes since {since}."
+    text = "\n\n".join(e.text for e in entries[:MAX_CHANGELOG_ENTRIES])
+    if len(entries) > MAX_CHANGELOG_ENTRIES:
+        text += f"\n\n({len(entries) - MAX_CHANGELOG_ENTRIES} older entries not shown; use `since` to narrow down.)"
+    return text
+
+
+CONTEXT_TOOLS = [
+    Tool(get_prompt_template),
+    Tool(list_form_templates),
+    Tool(get_keyterms_list),
+    Tool(get_changelog),
+]
@@ -1,59 +1,225 @@
+import hashlib
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Union, AsyncGenerator
 
 from pydantic_ai import Agent
 from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, UserPromptPart, TextPart
+from pydantic_ai.usage import RunUsage
 
 
-from models.chatbot import ChatRequest, ChatMessage
+from config import config
+from models.chatbot import AppContext, ChatRequest, ChatMessage
 from models.llm import LLMProvider
 from service.llm.core import LLMService
 from service.chatbot.actions import ACTION_REGISTRY
+from service.chatbot.answer_cache import answer_cache, is_personal_question
+from service.chatbot.context_tools import CONTEXT_TOOLS, changelog_index, context_index
+from service.chatbot.memory import (
+    SUMMARY_INSTRUCTIONS, ConversationWindow, conversation_memory, format_transcript)
+from service.chatbot.retrieval import KnowledgeBase, weighted_query
+from service.chatbot.transcript import format_passages, get_transcript_index
 from utils.logging import logger
 
+# Weights of the latest user message and of earlier turns in the retrieval query
+QUERY_WEIGHT_LATEST = 1.0
+QUERY_WEIGHT_RECENT = 0.4
+QUERY_RECENT_MESSAGES = 4
+
+# App context fields shared by many users; cacheable answers are generated from these only
+SHARED_CONTEXT_FIELDS = {"selected_provider", "selected_model", "app_mode", "app_version", "changelog"}
+REPLAY_CHUNK_CHARS = 80
+
+# Static prompt sections, built once at import.
+BASE_PROMPT = (
+    "You are a helpful assistant for the AI Audio Summary application. "
+    "You help users understand and use the app effectively. "
+    "Be concise, friendly, and accurate in your responses."
+)
+
+ACTIONS_PROMPT = (
+    "\n\n## Available Actions\n"
+    "You can propose actions that modify the app's settings or UI. "
+    "When the user asks you to change a setting or perform an action that matches one of the "
+    "available actions below, respond with your message AND include an action block.\n\n"
+    "Format the action block as a fenced code block with the language tag `action`:\n"
+    "```action\n"
+    '{"action_id": "<id>", "description": "<what it does>", "params": {<params>}}\n'
+    "```\n\n"
+    "Only propose ONE action per response. Only propose actions from this registry:\n\n"
+    f"{json.dumps(ACTION_REGISTRY, indent=2)}\n\n"
+    "IMPORTANT CONSTRAINTS:\n"
+    "- ALWAYS use the ```action``` code block format above to propose actions. "
+    "NEVER write action status text like '[Action applied: ...]' or '[Action cancelled...]' in your responses — "
+    "the system handles action execution and status display separately.\n"
+    "- If the user's message includes a note like '[The \"...\" action was applied successfully]', "
+    "that means the previous action was executed. Briefly acknowledge it but do NOT repeat the status note.\n"
+    "- Storage mode (local/account) CANNOT be changed via actions. If the user asks to switch storage mode, "
+    "explain that they need to use the avatar menu → Storage Mode dialog.\n"
+    "- For change_model, ONLY propose models that are listed in 'valid_models_per_provider' for the user's current provider. "
+    "Do NOT invent or guess model names.\n"
+    "- For change_provider, ONLY use providers from the enum list. "
+    "Azure OpenAI has no predefined models (it uses a deployment name configured in settings).\n"
+    "- Do NOT confuse 'switch_app_mode' (standard/realtime transcription mode) with storage mode (local/account).\n"
+    "- For save_prompt_template: write a complete, production-ready prompt. Use {language} as placeholder for the target language. Do NOT include field IDs — only name and content.\n"
+    "- For save_form_template: choose appropriate field types. For enum/multi_select fields, always include an options array. Do NOT include field IDs — only label, type, description, and options."
+)
+
+PROVIDER_DISPLAY_NAMES = {
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "gemini": "Google Gemini",
+    "azure_openai": "Azure OpenAI",
+    "langdock": "Langdock",
+    "pwc": "PwC",
+}
+
+
+@lru_cache(maxsize=None)
+def _static_prompt(actions_enabled: bool) -> str:
+    """Head of the system prompt that depends only on feature flags."""
+    return BASE_PROMPT + ("\n" + ACTIONS_PROMPT if actions_enabled else "")
+
 
 class ChatbotService:
-    _knowledge_base: str | None = None
     _knowledge_base_path = Path(
         __file__).parent.parent.parent / "usage_guide" / "usage_guide.md"
+    _knowledge_base = KnowledgeBase(_knowledge_base_path)
 
     def _load_knowledge_base(self) -> str:
-        """Load and cache the usage guide knowledge base."""
-        if self._knowledge_base is None:
-            try:
-                self._knowledge_base = self._knowledge_base_path.read_text(
-                    encoding="utf-8")
-                logger.info(
-                    f"Loaded knowledge base ({len(self._knowledge_base)} chars)")
-            except FileNotFoundError:
-                logger.warning(
-                    f"Knowledge base not found at {self._knowledge_base_path}")
-                self._knowledge_base = ""
-        return self._knowledge_base
-
-    def _build_system_prompt(self, request: ChatRequest) -> str:
-        """Assemble the system prompt based on enabled capabilities."""
-        parts = [
-            "You are a helpful assistant for the AI Audio Summary application. "
-            "You help users understand and use the app effectively. "
-            "Be concise, friendly, and accurate in your responses."
-        ]
+        """Return the usage guide text (re-read and re-indexed when the file changes)."""
+        self._knowledge_base.refresh()
+        return self._knowledge_base.text
+
+    def _knowledge_reference(self) -> str:
+        """Stable part of the knowledge base section (changes only with the guide file).
+
+        The whole guide, or with retrieval enabled an outline of it; the
+        matching excerpts follow later via ``_knowledge_excerpts()``.
+        """
+        knowledge = self._load_knowledge_base()
+        if not knowledge:
+            return ""
+        if not config.chatbot_kb_retrieval:
+            return (
+                "\n\n## Application Knowledge Base\n"
+                "Use the following documentation to answer questions about the application. "
+                "If the user asks something not covered here, say so honestly.\n\n"
+                f"{knowledge}"
+            )
+        return (
+            "\n\n## Application Knowledge Base\n"
+            "Use the documentation excerpts provided further below to answer questions about the "
+            "application. They are the sections of the usage guide most relevant to the conversation; "
+            "this outline shows everything the guide covers. If the answer is not in the excerpts, say "
+            "so honestly and point the user to the matching guide section from the outline instead of "
+            "guessing.\n\n"
+            f"### Guide outline\n{self._knowledge_base.outline}"
+        )
+
+    def _knowledge_excerpts(self, messages: list[ChatMessage]) -> str:
+        """Usage guide sections that best match the latest question (and, weighted lower, earlier turns).
+
+        At most CHATBOT_KB_TOP_K sections within CHATBOT_KB_TOKEN_BUDGET tokens.
+        """
+        if not config.chatbot_kb_retrieval or not self._knowledge_base.text:
+            return ""
+        sections = self._knowledge_base.search(
+            self._retrieval_query(messages),
+            top_k=config.chatbot_kb_top_k,
+            token_budget=config.chatbot_kb_token_budget,
+        )
+        excerpts = "\n\n".join(f"[Section: {s.title}]\n{s.text}" for s in sections)
+        return (
+            "\n\n## Relevant Documentation Excerpts\n"
+            f"{excerpts or '(no section of the usage guide matched this question)'}"
+        )
+
+    def _transcript_prompt(self, transcript: str, messages: list[ChatMessage]) -> str:
+        """Transcript section of the system prompt.
+
+        Transcripts up to CHATBOT_TRANSCRIPT_RETRIEVAL_TOKENS are included in
+        full. Longer ones are replaced by a short overview plus the passages
+        most relevant to the conversation (and the latest ones), within
+        CHATBOT_TRANSCRIPT_TOKEN_BUDGET.
+        """
+        intro = (
+            "\n\n## Current Transcript\n"
+            "The user has an active transcript in their session. "
+            "You can reference it to answer questions about the meeting content. "
+            "If the user asks about the transcript or meeting, use this context. "
+            "Let the user know you have access to their transcript only if they ask about it "
+            "or if it's relevant to their question.\n\n"
+        )
+        threshold = config.chatbot_transcript_retrieval_tokens
+        if not threshold or len(transcript) <= threshold * 4:
+            return intro + transcript
+
+        index = get_transcript_index(transcript)
+        if index.tokens <= threshold:
+            return intro + transcript
+        passages = index.select(
+            self._retrieval_query(messages), messages[-1].content, config.chatbot_transcript_token_budget)
+        return (
+            intro
+            + "The transcript is too long to include in full. Below are an overview and the passages "
+            "most relevant to the conversation (plus the most recent ones), in chronological order; "
+            "[…] marks omitted parts. If answering needs parts that are not shown, say so and suggest "
+            "a more specific question instead of guessing.\n\n"
+            f"### Overview\n{index.overview()}\n\n"
+            f"### Relevant passages\n{format_passages(passages)}"
+        )
+
+    @staticmethod
+    def _retrieval_query(messages: list[ChatMessage]) -> dict[str, float]:
+        """Retrieval query: the latest message, plus the preceding turns at a lower weight."""
+        return weighted_query(
+            [(messages[-1].content, QUERY_WEIGHT_LATEST)]
+            + [(m.content, QUERY_WEIGHT_RECENT) for m in messages[-1 - QUERY_RECENT_MESSAGES:-1]]
+        )
+
+    @staticmethod
+    def _history_prompt(window: ConversationWindow) -> str:
+        """Summary of the messages that no longer fit the history budget."""
+        if not window.dropped:
+            return ""
+        if not window.summary:
+            return (
+                "\n\n## Earlier Conversation\n"
+                f"{window.dropped} earlier messages of this conversation are not shown. If the user "
+                "refers to something you cannot see, ask them to repeat the relevant details."
+            )
+        note = ""
+        if window.summarized < window.dropped:
+            note = f" The {window.dropped - window.summarized} messages after it are not shown."
+        return (
+            "\n\n## Earlier Conversation\n"
+            f"Summary of the first {window.summarized} messages of this conversation, which are no "
+            f"longer shown verbatim.{note}\n\n{window.summary}"
+        )
+
+    def _build_system_prompt(self, request: ChatRequest, history: ConversationWindow | None = None) -> str:
+        """Assemble the system prompt based on enabled capabilities.
+
+        Sections run from most to least stable so provider-side prompt
+        caching can reuse the longest prefix: the static head (persona and
+        action registry, cached per flag combination), the knowledge base
+        reference (changes only with the guide file), the user's settings
+        and changelog (stable within a conversation), and last the per-turn
+        documentation excerpts, transcript and the summary of older turns.
+        """
+        parts = [_static_prompt(request.actions_enabled)]
+
+        if request.qa_enabled:
+            parts.append(self._knowledge_reference())
 
         # Include current user settings context
         if request.app_context:
             ctx = request.app_context
             context_lines = []
-            _PROVIDER_DISPLAY_NAMES = {
-                "openai": "OpenAI",
-                "anthropic": "Anthropic",
-                "gemini": "Google Gemini",
-                "azure_openai": "Azure OpenAI",
-                "langdock": "Langdock",
-                "pwc": "PwC",
-            }
             if ctx.selected_provider:
-                display = _PROVIDER_DISPLAY_NAMES.get(ctx.selected_provider, ctx.selected_provider)
+                display = PROVIDER_DISPLAY_NAMES.get(ctx.selected_provider, ctx.selected_provider)
                 context_lines.append(
                     f"- Current LLM provider: {display} (id: {ctx.selected_provider})")
             if ctx.selected_model:
@@ -80,14 +246,16 @@ class ChatbotService:
             if ctx.default_chatbot_copy_format:
                 context_lines.append(
                     f"- Default chatbot copy format: {ctx.default_chatbot_copy_format}")
-            if ctx.custom_templates:
+            if request.context_tools:
+                context_lines.extend(context_index(ctx))
+            if ctx.custom_templates and not request.context_tools:
                 tpl_lines = []
                 for t in ctx.custom_templates:
                     tpl_lines.append(
                         f"  - ID: `{t.id}` | Name: {t.name}\n    Content: {t.content}")
                 context_lines.append(
                     "- Custom prompt templates:\n" + "\n".join(tpl_lines))
-            if ctx.form_templates:
+            if ctx.form_templates and not request.context_tools:
                 tpl_lines = []
                 for t in ctx.form_templates:
                     field_desc = ", ".join(
@@ -114,7 +282,7 @@ class ChatbotService:
             if not ctx.webhook_url:
                 context_lines.append(
                     "- Webhook: not configured")
-            if ctx.keyterms_lists:
+            if ctx.keyterms_lists and not request.context_tools:
                 kt_lines = []
                 for kt in ctx.keyterms_lists:
                     terms_preview = ", ".join(kt.terms[:5])
@@ -145,61 +313,19 @@ class ChatbotService:
                 parts.append(
                     "\n\n## Version History & Changelog\n" +
                     changelog_instructions + "\n\n" +
-                    ctx.changelog
+                    (changelog_index(ctx.changelog) if request.context_tools else ctx.changelog)
                 )
 
         if request.qa_enabled:
-            knowledge = self._load_knowledge_base()
-            if knowledge:
-                parts.append(
-                    "\n\n## Application Knowledge Base\n"
-                    "Use the following documentation to answer questions about the application. "
-                    "If the user asks something not covered here, say so honestly.\n\n"
-                    f"{knowledge}"
-                )
+            parts.append(self._knowledge_excerpts(request.messages))
 
         if request.transcript_enabled and request.transcript:
-            parts.append(
-                "\n\n## Current Transcript\n"
-                "The user has an active transcript in their session. "
-                "You can reference it to answer questions about the meeting content. "
-                "If the user asks about the transcript or meeting, use this context. "
-                "Let the user know you have access to their transcript only if they ask about it "
-                "or if it's relevant to their question.\n\n"
-                f"{request.transcript}"
-            )
+            parts.append(self._transcript_prompt(request.transcript, request.messages))
 
-        if request.actions_enabled:
-            actions_json = json.dumps(ACTION_REGISTRY, indent=2)
-            parts.append(
-                "\n\n## Available Actions\n"
-                "You can propose actions that modify the app's settings or UI. "
-                "When the user asks you to change a setting or perform an action that matches one of the "
-                "available actions below, respond with your message AND include an action block.\n\n"
-                "Format the action block as a fenced code block with the language tag `action`:\n"
-                "```action\n"
-                '{"action_id": "<id>", "description": "<what it does>", "params": {<params>}}\n'
-                "```\n\n"
-                "Only propose ONE action per response. Only propose actions from this registry:\n\n"
-                f"{actions_json}\n\n"
-                "IMPORTANT CONSTRAINTS:\n"
-                "- ALWAYS use the ```action``` code block format above to propose actions. "
-                "NEVER write action status text like '[Action applied: ...]' or '[Action cancelled...]' in your responses — "
-                "the system handles action execution and status display separately.\n"
-                "- If the user's message includes a note like '[The \"...\" action was applied successfully]', "
-                "that means the previous action was executed. Briefly acknowledge it but do NOT repeat the status note.\n"
-                "- Storage mode (local/account) CANNOT be changed via actions. If the user asks to switch storage mode, "
-                "explain that they need to use the avatar menu → Storage Mode dialog.\n"
-                "- For change_model, ONLY propose models that are listed in 'valid_models_per_provider' for the user's current provider. "
-                "Do NOT invent or guess model names.\n"
-                "- For change_provider, ONLY use providers from the enum list. "
-                "Azure OpenAI has no predefined models (it uses a deployment name configured in settings).\n"
-                "- Do NOT confuse 'switch_app_mode' (standard/realtime transcription mode) with storage mode (local/account).\n"
-                "- For save_prompt_template: write a complete, production-ready prompt. Use {language} as placeholder for the target language. Do NOT include field IDs — only name and content.\n"
-                "- For save_form_template: choose appropriate field types. For enum/multi_select fields, always include an options array. Do NOT include field IDs — only label, type, description, and options."
-            )
+        if history is not None:
+            parts.append(self._history_prompt(history))
 
-        return "\n".join(parts)
+        return "\n".join(part for part in parts if part)
 
     def _build_message_history(self, messages: list[ChatMessage]) -> list[ModelMessage]:
         """Convert ChatMessage list to pydantic-ai ModelMessage objects for proper multi-turn."""
@@ -213,8 +339,45 @@ class ChatbotService:
                     parts=[TextPart(content=msg.content)]))
         return history
 
+    def _answer_cache_scope(self, request: ChatRequest) -> str | None:
+        """Cache scope of a request, or None if its answer must not be cached.
+
+        Only first-turn Q&A requests without transcript or actions qualify,
+        and only if the question does not refer to the user's own settings,
+        data or visits (those need the personal context). Their scope covers the app version and the shared settings, so an
+        entry is never reused across versions.
+        """
+        if (
+            not config.chatbot_answer_cache
+            or len(request.messages) != 1
+            or not request.qa_enabled
+            or request.actions_enabled
+            or (request.transcript_enabled and request.transcript)
+            or is_personal_question(request.messages[-1].content)
+        ):
+            return None
+        self._knowledge_base.refresh()
+        answer_cache.sync(self._knowledge_base.version)
+        shared = request.app_context.model_dump(include=SHARED_CONTEXT_FIELDS - {"changelog"}) \
+            if request.app_context else {}
+        return hashlib.sha256(json.dumps(shared, sort_keys=True).encode()).hexdigest()
+
     async def chat(self, request: ChatRequest) -> Union[str, AsyncGenerator[str, None]]:
         """Main chat method. Returns a string or async generator depending on stream flag."""
+        cache_scope = self._answer_cache_scope(request)
+        if cache_scope is not None:
+            cached = answer_cache.lookup(cache_scope, request.messages[-1].content)
+            if cached is not None:
+                logger.info(f"Chatbot answer cache hit ({cached.hits} hits)")
+                if request.stream:
+                    return self._replay_answer(cached.answer)
+                return cached.answer, RunUsage()
+            # The question needs no personal settings; keep them out of an answer other users may get
+            if request.app_context:
+                request = request.model_copy(update={"app_context": request.app_context.model_copy(
+                    update={name: None for name in type(request.app_context).model_fields
+                            if name not in SHARED_CONTEXT_FIELDS})})
+
         llm_service = LLMService()
 
         model_name = request.model
@@ -229,8 +392,15 @@ class ChatbotService:
             langdock_config=request.langdock_config
         )
 
-        system_prompt = self._build_system_prompt(request)
-        trimmed_messages = request.messages[-20:]
+        summarize = None
+        if config.chatbot_history_summary:
+            async def summarize(previous: str | None, messages: list[ChatMessage]) -> str:
+                return await self._summarize_history(model, request.provider, model_name, previous, messages)
+
+        window = conversation_memory.window(
+            request.messages, config.chatbot_history_token_budget, summarize)
+        system_prompt = self._build_system_prompt(request, window)
+        trimmed_messages = window.messages
 
         # Build proper multi-turn message history (all messages except the last)
         message_history: list[ModelMessage] | None = None
@@ -245,30 +415,87 @@ class ChatbotService:
         # provider adapters insert them at the beginning of the conversation.
         # This avoids the issue where system_prompt was either skipped (when history
         # exists) or placed after history messages.
+        # With context_tools, large app context parts are only listed in the
+        # prompt and fetched by the model through tools when it needs them.
+        use_tools = request.context_tools and request.app_context is not None
         agent = Agent(
             model,
             instructions=system_prompt,
+            deps_type=AppContext,
+            tools=CONTEXT_TOOLS if use_tools else (),
             model_settings=LLMService.build_model_settings(
                 request.provider, model_name, temperature=0.7)
         )
+        deps = request.app_context if use_tools else None
 
         if request.stream:
-            return self._stream_response(agent, user_prompt, message_history)
+            stream = self._stream_response(agent, user_prompt, message_history, deps)
+            if cache_scope is not None:
+                stream = self._cache_streamed_answer(stream, cache_scope, user_prompt)
+            return stream
         else:
-            result = await agent.run(user_prompt, message_history=message_history)
+            result = await agent.run(user_prompt, message_history=message_history, deps=deps)
+            if cache_scope is not None:
+                answer_cache.store(cache_scope, user_prompt, result.output)
             return result.output, result.usage()
 
+    @staticmethod
+    async def _cache_streamed_answer(
+        stream: AsyncGenerator[str, None], scope: str, question: str
+    ) -> AsyncGenerator[str, None]:
+        """Pass a response stream through and cache the answer once it completed without errors."""
+        chunks = []
+        failed = False
+        async for chunk in stream:
+            if chunk.startswith("\n\n<!--STREAM_ERROR:"):
+                failed = True
+            elif not chunk.startswith("\n\n<!--TOKEN_USAGE:"):
+                chunks.append(chunk)
+            yield chunk
+        if not failed:
+            answer_cache.store(scope, question, "".join(chunks))
+
+    @staticmethod
+    async def _replay_answer(answer: str) -> AsyncGenerator[str, None]:
+        """Stream a cached answer in the same format as a live response (no tokens used)."""
+        for start in range(0, len(answer), REPLAY_CHUNK_CHARS):
+            yield answer[start:start + REPLAY_CHUNK_CHARS]
+        yield "\n\n<!--TOKEN_USAGE:" + json.dumps(
+            {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, "cached": True}) + "-->"
+
+    @staticmethod
+    async def _summarize_history(
+        model,
+        provider: LLMProvider,
+        model_name: str,
+        previous: str | None,
+        messages: list[ChatMessage],
+    ) -> str:
+        """Fold ``messages`` into the running summary ``previous`` (runs in the background)."""
+        agent = Agent(
+            model,
+            instructions=SUMMARY_INSTRUCTIONS,
+            model_settings=LLMService.build_model_settings(provider, model_name, temperature=0.2)
+        )
+        prompt = (
+            f"Existing summary:\n{previous or '(none)'}\n\n"
+            f"New messages:\n{format_transcript(messages)}"
+        )
+        result = await agent.run(prompt)
+        return result.output
+
     async def _stream_response(
         self,
         agent: Agent,
         user_prompt: str,
         message_history: list[ModelMessage] | None = None,
+        deps: AppContext | None = None,
     ) -> AsyncGenerator[str, None]:
         """Stream response chunks from the LLM agent."""
         import json as _json
         has_yielded = False
         try:
-            async with agent.run_stream(user_prompt, message_history=message_history) as stream:
+            async with agent.run_stream(user_prompt, message_history=message_history, deps=deps) as stream:
                 async for chunk in stream.stream_text(delta=True):
                     has_yielded = True
                     yield chunk
@@ -310,5 +537,9 @@ class ChatbotService:
         return {
             "loaded": bool(knowledge),
             "length": len(knowledge) if knowledge else 0,
-            "path": str(self._knowledge_base_path)
+            "path": str(self._knowledge_base_path),
+            "sections": len(self._knowledge_base.sections),
+            "retrieval": config.chatbot_kb_retrieval,
+            "history": conversation_memory.stats(),
+            "answer_cache": {"enabled": config.chatbot_answer_cache, **answer_cache.stats()},
         }
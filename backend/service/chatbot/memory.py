@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from models.chatbot import ChatMessage, ChatRole
+from service.chatbot.retrieval import estimate_tokens
+from utils.logging import logger
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role and framing per message
+MAX_SUMMARY_TOKENS = 600  # longer summaries are cut, so the summary section stays bounded
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and the assistant of the "
+    "AI Audio Summary application. Update the existing summary (if any) with the new messages. "
+    "Keep facts the user stated about themselves, their settings and their meetings, decisions, "
+    "actions that were proposed or applied, and open questions. Drop small talk and anything the "
+    "assistant only quoted from documentation. Write at most 200 words as terse bullet points, "
+    "in the language of the conversation. Reply with the summary only."
+)
+
+# (previous summary or None, messages to fold in) -> updated summary
+Summarizer = Callable[[str | None, list[ChatMessage]], Awaitable[str]]
+
+
+@dataclass
+class ConversationWindow:
+    summary: str | None  # rolling summary of (some of) the older messages
+    messages: list[ChatMessage]  # recent messages sent verbatim; the last one is the new user message
+    dropped: int  # older messages not sent verbatim
+    summarized: int  # how many of those the summary covers
+
+
+def message_tokens(message: ChatMessage) -> int:
+    return estimate_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _prefix_keys(messages: list[ChatMessage]) -> list[str]:
+    """Chained hashes: ``keys[i]`` identifies the conversation prefix ``messages[:i + 1]``."""
+    keys = []
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(message.role.value.encode())
+        digest.update(b"\0")
+        digest.update(message.content.encode())
+        digest.update(b"\0")
+        keys.append(digest.copy().hexdigest())
+    return keys
+
+
+def format_transcript(messages: list[ChatMessage]) -> str:
+    return "\n\n".join(f"{m.role.value.capitalize()}: {m.content}" for m in messages)
+
+
+class ConversationMemory:
+    """Token-budgeted chat history with a rolling summary of older turns.
+
+    ``window()`` keeps the most recent messages that fit into the budget
+    verbatim. Older messages are represented by a cached summary keyed by a
+    hash of the conversation prefix it covers. Summaries are produced in the
+    background and folded forward incrementally (previous summary plus the
+    newly dropped messages), so a request never waits for one: a turn that
+    drops messages for the first time goes out without a summary, and the
+    following turns pick it up from the cache.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self._max_entries = max_entries
+        self._summaries: OrderedDict[str, tuple[int, str]] = OrderedDict()  # prefix key -> (messages, summary)
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def window(
+        self,
+        messages: list[ChatMessage],
+        token_budget: int,
+        summarize: Summarizer | None = None,
+    ) -> ConversationWindow:
+        """Split ``messages`` into a summary of older turns and the recent ones that fit ``token_budget``.
+
+        The latest message is always kept. The verbatim part starts with a
+        user message, as some providers require. With ``summarize`` given,
+        a summary covering every dropped message is scheduled in the
+        background unless one is cached or already being generated.
+        """
+        start = len(messages) - 1
+        used = message_tokens(messages[-1])
+        while start > 0 and used + message_tokens(messages[start - 1]) <= token_budget:
+            start -= 1
+            used += message_tokens(messages[start])
+        while start < len(messages) - 1 and messages[start].role != ChatRole.user:
+            start += 1
+        if start == 0:
+            return ConversationWindow(summary=None, messages=messages, dropped=0, summarized=0)
+
+        dropped = messages[:start]
+        keys = _prefix_keys(dropped)
+        covered, summary = 0, None
+        for i in range(len(keys) - 1, -1, -1):
+            entry = self._summaries.get(keys[i])
+            if entry is not None:
+                self._summaries.move_to_end(keys[i])
+                covered, summary = entry
+                break
+        if covered < len(dropped) and summarize is not None:
+            self._schedule(keys[-1], len(dropped), summary, dropped[covered:], summarize)
+        return ConversationWindow(
+            summary=summary, messages=messages[start:], dropped=len(dropped), summarized=covered)
+
+    def stats(self) -> dict:
+        return {"summaries": len(self._summaries), "pending": len(self._pending)}
+
+    async def close(self) -> None:
+        """Cancel summaries still being generated."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _schedule(
+        self,
+        key: str,
+        count: int,
+        previous: str | None,
+        new_messages: list[ChatMessage],
+        summarize: Summarizer,
+    ) -> None:
+        if key in self._pending:
+            return
+        task = asyncio.create_task(self._summarize(key, count, previous, new_messages, summarize))
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+    async def _summarize(
+        self,
+        key: str,
+        count: int,
+        previous: str | None,
+        new_messages: list[ChatMessage],
+        summarize: Summarizer,
+    ) -> None:
+        try:
+            summary = (await summarize(previous, new_messages)).strip()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Chatbot history summary failed: {e}")
+            return
+        if not summary:
+            return
+        if estimate_tokens(summary) > MAX_SUMMARY_TOKENS:
+            summary = summary[:MAX_SUMMARY_TOKENS * 4].rsplit("\n", 1)[0] + "\n…"
+        self._summaries[key] = (count, summary)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self._max_entries:
+            self._summaries.popitem(last=False)
+
+
+conversation_memory = ConversationMemory()
@@ -0,0 +1,227 @@
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.logging import logger
+
+HEADING_RE = re.compile(r"^(#{1,4})\s+(.*\S)\s*$")
+TOKEN_RE = re.compile(r"[a-z0-9äöüß]+")
+MAX_SECTION_TOKENS = 700  # longer sections are split at paragraph boundaries
+SUFFIXES = ("ing", "ed", "es", "s")
+
+# Too frequent in questions to carry meaning; keeps query scoring focused.
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it me my of on or "
+    "the this to what when where which who why with you your".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for prompt budgets."""
+    return len(text) // 4 + 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens without stopwords, lightly stemmed ("webhooks" -> "webhook")."""
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and not token.endswith("ss"):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix):
+                return token[:-len(suffix)]
+    return token
+
+
+class BM25Index:
+    """Okapi BM25 over pre-tokenized documents, with an inverted index.
+
+    Scoring only touches the postings of the query terms, so a search costs
+    O(matching postings) rather than O(documents x vocabulary).
+    """
+
+    def __init__(self, documents: list[list[str]], k1: float = 1.5, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._size = len(documents)
+        self._lengths = [len(doc) for doc in documents]
+        self._avg_length = sum(self._lengths) / self._size if self._size else 0.0
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        for i, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                self._postings.setdefault(term, []).append((i, tf))
+        self._idf = {
+            term: math.log(1 + (self._size - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+
+    def scores(self, query: dict[str, float]) -> list[float]:
+        """BM25 score of every document for a weighted bag of query terms."""
+        scores = [0.0] * self._size
+        if not self._avg_length:
+            return scores
+        for term, weight in query.items():
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                norm = self._k1 * (1 - self._b + self._b * self._lengths[i] / self._avg_length)
+                scores[i] += weight * idf * tf * (self._k1 + 1) / (tf + norm)
+        return scores
+
+    def top(self, query: dict[str, float], k: int) -> list[tuple[int, float]]:
+        """Indices and scores of the ``k`` best matching documents (score > 0)."""
+        matches = ((i, s) for i, s in enumerate(self.scores(query)) if s > 0)
+        return heapq.nlargest(k, matches, key=lambda item: item[1])
+
+
+def weighted_query(texts: list[tuple[str, float]]) -> dict[str, float]:
+    """Merge several texts into one query, each term weighted by its text's weight."""
+    query: dict[str, float] = {}
+    for text, weight in texts:
+        for term in set(tokenize(text)):
+            query[term] = query.get(term, 0.0) + weight
+    return query
+
+
+@dataclass
+class KnowledgeSection:
+    title: str  # heading breadcrumb below the document title, e.g. "4. Features > 4.9 Realtime Mode > Speech Model"
+    text: str  # markdown including the section's own heading line
+    position: int  # order in the document
+    tokens: int
+
+
+def split_sections(markdown: str, max_tokens: int = MAX_SECTION_TOKENS) -> list[KnowledgeSection]:
+    """Split a markdown document at headings (levels 1-4) into sections.
+
+    Each section carries the path of headings above it. Headings inside
+    fenced code blocks are ignored, heading-only sections are dropped and
+    sections above ``max_tokens`` are split at paragraph boundaries.
+    """
+    sections: list[KnowledgeSection] = []
+    trail: list[tuple[int, str]] = []  # (level, heading) of the enclosing headings
+    lines: list[str] = []
+    in_fence = False
+
+    def close() -> None:
+        body = "\n".join(lines).strip()
+        lines.clear()
+        if not body or all(HEADING_RE.match(line) for line in body.splitlines() if line.strip()):
+            return
+        title = " > ".join(heading for level, heading in trail if level > 1)
+        for chunk in _split_paragraphs(body, max_tokens):
+            sections.append(KnowledgeSection(
+                title=title, text=chunk, position=len(sections), tokens=estimate_tokens(chunk)))
+
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            close()
+            level = len(match.group(1))
+            while trail and trail[-1][0] >= level:
+                trail.pop()
+            trail.append((level, match.group(2)))
+        lines.append(line)
+    close()
+    return sections
+
+
+def _split_paragraphs(body: str, max_tokens: int) -> list[str]:
+    if estimate_tokens(body) <= max_tokens:
+        return [body]
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for paragraph in re.split(r"\n\s*\n", body):
+        paragraph = paragraph.strip()
+        if not paragraph or paragraph == "---":
+            continue
+        tokens = estimate_tokens(paragraph)
+        if current and size + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class KnowledgeBase:
+    """Heading-based BM25 index over the usage guide.
+
+    The file is split into sections and indexed on first use, and re-indexed
+    whenever its modification time changes, so edits to the guide are picked
+    up without a restart. ``search()`` returns the best matching sections
+    that fit into a token budget, in document order.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.text = ""
+        self.sections: list[KnowledgeSection] = []
+        self.outline = ""
+        self._index: BM25Index | None = None
+        self._mtime: float | None = None
+
+    @property
+    def version(self) -> float | None:
+        """Modification time of the indexed file (changes whenever it is re-indexed)."""
+        return self._mtime
+
+    def refresh(self) -> None:
+        """(Re)build the index if the file changed since it was last read."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if self._mtime is not None or self._index is None:
+                logger.warning(f"Knowledge base not found at {self.path}")
+            self.text, self.sections, self.outline = "", [], ""
+            self._index = BM25Index([])
+            self._mtime = None
+            return
+        if mtime == self._mtime and self._index is not None:
+            return
+        self.text = self.path.read_text(encoding="utf-8")
+        self.sections = split_sections(self.text)
+        # The section text starts with its own heading; adding the breadcrumb
+        # counts heading terms twice and lets parent headings match too.
+        self._index = BM25Index([
+            tokenize(section.title) + tokenize(section.text) for section in self.sections
+        ])
+        self.outline = _outline(self.text)
+        self._mtime = mtime
+        logger.info(f"Indexed knowledge base ({len(self.text)} chars, {len(self.sections)} sections)")
+
+    def search(self, query: dict[str, float], top_k: int, token_budget: int) -> list[KnowledgeSection]:
+        self.refresh()
+        selected: list[KnowledgeSection] = []
+        used = 0
+        for i, _ in self._index.top(query, top_k):
+            section = self.sections[i]
+            if used + section.tokens > token_budget:
+                continue
+            selected.append(section)
+            used += section.tokens
+        return sorted(selected, key=lambda s: s.position)
+
+
+def _outline(markdown: str) -> str:
+    """Compact list of the guide's level 2 and 3 headings."""
+    headings = []
+    in_fence = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match and len(match.group(1)) in (2, 3) and match.group(2) != "Table of Contents":
+            indent = "  " if len(match.group(1)) == 3 else ""
+            headings.append(f"{indent}- {match.group(2)}")
+    return "\n".join(headings)
@@ -0,0 +1,142 @@
+import re
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from config import config
+from models.chatbot import AppContext, ChatMessage, ChatRequest, ChatRole, ChatSessionTurnRequest
+from utils.logging import logger
+
+MAX_SESSION_MESSAGES = 200  # oldest messages are dropped beyond this (history is summarized anyway)
+ACTION_BLOCK_RE = re.compile(r"```action\s*\n[\s\S]*?\n```")
+MARKER_RE = re.compile(r"\n\n<!--(?:TOKEN_USAGE|STREAM_ERROR):.*?-->", re.DOTALL)
+
+
+class StaleContextError(Exception):
+    """Raised when a turn references a context version the session does not hold."""
+
+
+@dataclass(eq=False)
+class ChatSession:
+    id: str
+    messages: list[ChatMessage] = field(default_factory=list)
+    app_context: AppContext | None = None
+    app_context_version: str | None = None
+    transcript: str | None = None
+    transcript_version: str | None = None
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def stored_reply(text: str) -> str:
+    """Assistant reply as kept in the history: without action blocks or stream markers.
+
+    Mirrors what the frontend sends back for assistant messages, so the
+    model does not start imitating action blocks of earlier turns.
+    """
+    return ACTION_BLOCK_RE.sub("", MARKER_RE.sub("", text)).strip()
+
+
+class ChatSessionStore:
+    """In-memory chatbot conversations, so clients send only the new message per turn.
+
+    Each session keeps the history, the app context and the transcript.
+    Sessions idle for longer than ``ttl_seconds`` are discarded, and at most
+    ``max_sessions`` are kept (least recently used first out). Like the
+    realtime session registry's memory backend, sessions live in this
+    worker only; a client that gets a 404 recreates its session from its
+    local history.
+    """
+
+    def __init__(self, ttl_seconds: int, max_sessions: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()  # least recently used first
+
+    def create(self) -> ChatSession:
+        self._evict()
+        session = ChatSession(id=secrets.token_urlsafe(16))
+        self._sessions[session.id] = session
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> ChatSession | None:
+        self._evict()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        self._evict()
+        return {"sessions": len(self._sessions), "ttl_seconds": self.ttl_seconds}
+
+    @staticmethod
+    def update_context(
+        session: ChatSession,
+        app_context: AppContext | None,
+        app_context_version: str | None,
+        transcript: str | None,
+        transcript_version: str | None,
+    ) -> None:
+        """Apply context deltas; raises ``StaleContextError`` if a referenced version is not stored."""
+        if app_context is None and app_context_version not in (None, session.app_context_version):
+            raise StaleContextError("app_context")
+        if transcript is None and transcript_version not in (None, session.transcript_version):
+            raise StaleContextError("transcript")
+        if app_context is not None:
+            if session.app_context is None:
+                session.app_context = app_context
+            else:
+                session.app_context = session.app_context.model_copy(
+                    update={name: getattr(app_context, name) for name in app_context.model_fields_set})
+            session.app_context_version = app_context_version
+        if transcript is not None:
+            session.transcript = transcript or None
+            session.transcript_version = transcript_version
+
+    @staticmethod
+    def chat_request(session: ChatSession, turn: ChatSessionTurnRequest) -> ChatRequest:
+        """Full ``ChatRequest`` for a turn, built from already validated parts (no re-validation)."""
+        return ChatRequest.model_construct(
+            messages=[*session.messages, ChatMessage(role=ChatRole.user, content=turn.message)],
+            provider=turn.provider,
+            model=turn.model,
+            api_key=turn.api_key,
+            azure_config=turn.azure_config,
+            langdock_config=turn.langdock_config,
+            qa_enabled=turn.qa_enabled,
+            transcript_enabled=turn.transcript_enabled,
+            actions_enabled=turn.actions_enabled,
+            context_tools=turn.context_tools,
+            transcript=session.transcript,
+            stream=turn.stream,
+            app_context=session.app_context,
+        )
+
+    @staticmethod
+    def record_turn(session: ChatSession, base_length: int, message: ChatMessage, reply: str) -> None:
+        """Append a completed turn, unless another turn finished first (its reply wins)."""
+        if len(session.messages) != base_length:
+            logger.warning(f"Chat session {session.id[:8]}: concurrent turn, reply not stored")
+            return
+        session.messages.append(message)
+        session.messages.append(ChatMessage(role=ChatRole.assistant, content=stored_reply(reply)))
+        del session.messages[:-MAX_SESSION_MESSAGES]
+
+    def _evict(self) -> None:
+        """Drop idle sessions; the dict is ordered by last use, so only its head is checked."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+
+chat_sessions = ChatSessionStore(config.chatbot_session_ttl_seconds, config.chatbot_max_sessions)
@@ -0,0 +1,217 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from service.chatbot.retrieval import BM25Index, estimate_tokens, tokenize
+
+# "Speaker A: text" / "Alice Smith: text" (labels of up to 4 words)
+SPEAKER_RE = re.compile(r"^((?:[^\s:\[\]]+ ?){1,4}):\s+(\S.*)$")
+# "[00:01 - 00:05]" line the frontend appends to each utterance when timestamps are shown
+TIMESTAMP_RE = re.compile(r"^\[(\d{1,2}(?::\d{2}){1,2})\s*-\s*(\d{1,2}(?::\d{2}){1,2})\]$")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+PASSAGE_TOKENS = 250  # consecutive turns are grouped into passages of about this size
+RECENT_PASSAGES = 2  # latest passages always included (live meetings ask about "just now")
+MIN_RELATIVE_SCORE = 0.2  # passages scoring below this fraction of the best match are left out
+
+
+@dataclass
+class SpeakerTurn:
+    speaker: str | None
+    text: str  # verbatim transcript lines of the turn
+    start: str | None = None
+    end: str | None = None
+
+
+@dataclass
+class TranscriptPassage:
+    position: int
+    speakers: list[str]
+    start: str | None
+    end: str | None
+    text: str
+    tokens: int
+
+
+def split_turns(transcript: str, speakers: list[str] | None = None) -> list[SpeakerTurn]:
+    """Split a transcript into speaker turns.
+
+    Understands the formats the app sends (``Speaker: text`` lines, each
+    optionally followed by a ``[mm:ss - mm:ss]`` line); anything else
+    (fast-mode realtime text, pasted transcripts) falls back to paragraphs.
+    With ``speakers``, only lines starting with one of these labels and a
+    colon start a turn (longest label first, so "Speaker A" does not
+    swallow "Speaker AB"); other ``Label:`` lines continue the current turn.
+    """
+    prefixes = None if speakers is None else [
+        f"{s}:" for s in sorted(speakers, key=len, reverse=True)]
+    turns: list[SpeakerTurn] = []
+    for line in transcript.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        timestamp = TIMESTAMP_RE.match(stripped)
+        if timestamp and turns:
+            turns[-1].start, turns[-1].end = timestamp.group(1), timestamp.group(2)
+            turns[-1].text += "\n" + stripped
+            continue
+        if prefixes is None:
+            speaker = SPEAKER_RE.match(stripped)
+            label = speaker.group(1).strip() if speaker else None
+        else:
+            label = next((p[:-1] for p in prefixes if stripped.startswith(p)), None)
+        if label:
+            turns.append(SpeakerTurn(speaker=label, text=stripped))
+        elif turns and turns[-1].speaker is not None:
+            turns[-1].text += "\n" + stripped
+        else:
+            turns.append(SpeakerTurn(speaker=None, text=stripped))
+    if not any(t.speaker for t in turns):
+        turns = [SpeakerTurn(speaker=None, text=p.strip())
+                 for p in re.split(r"\n\s*\n", transcript) if p.strip()]
+    return turns
+
+
+def build_passages(turns: list[SpeakerTurn], max_tokens: int = PASSAGE_TOKENS) -> list[TranscriptPassage]:
+    """Group consecutive turns into passages of about ``max_tokens``; long turns are split at sentences."""
+    pieces: list[SpeakerTurn] = []
+    for turn in turns:
+        if estimate_tokens(turn.text) <= max_tokens * 2:
+            pieces.append(turn)
+            continue
+        prefix = f"{turn.speaker}: " if turn.speaker else ""
+        body = turn.text[len(prefix):] if prefix and turn.text.startswith(prefix) else turn.text
+        chunk = ""
+        for sentence in SENTENCE_RE.split(body):
+            if chunk and estimate_tokens(chunk) + estimate_tokens(sentence) > max_tokens:
+                pieces.append(SpeakerTurn(turn.speaker, prefix + chunk, turn.start, turn.end))
+                chunk = ""
+            chunk = f"{chunk} {sentence}".strip()
+        if chunk:
+            pieces.append(SpeakerTurn(turn.speaker, prefix + chunk, turn.start, turn.end))
+
+    passages: list[TranscriptPassage] = []
+    group: list[SpeakerTurn] = []
+
+    def close() -> None:
+        if not group:
+            return
+        text = "\n\n".join(t.text for t in group)
+        speakers = list(dict.fromkeys(t.speaker for t in group if t.speaker))
+        passages.append(TranscriptPassage(
+            position=len(passages),
+            speakers=speakers,
+            start=next((t.start for t in group if t.start), None),
+            end=next((t.end for t in reversed(group) if t.end), None),
+            text=text,
+            tokens=estimate_tokens(text),
+        ))
+        group.clear()
+
+    size = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece.text)
+        if group and size + tokens > max_tokens:
+            close()
+            size = 0
+        group.append(piece)
+        size += tokens
+    close()
+    return passages
+
+
+def _speaker_term(speaker: str) -> str:
+    return "speaker:" + speaker.lower()
+
+
+class TranscriptIndex:
+    """BM25 index over the passages of one transcript, with speaker and time metadata.
+
+    Each passage is indexed with a speaker term per participant, so a
+    question naming a speaker ("what did Speaker B say about …") favors
+    that speaker's passages.
+    """
+
+    def __init__(self, transcript: str) -> None:
+        turns = split_turns(transcript)
+        self.tokens = estimate_tokens(transcript)
+        self.passages = build_passages(turns)
+        self.speakers = list(dict.fromkeys(t.speaker for t in turns if t.speaker))
+        self._words: dict[str, int] = {}
+        self._turns: dict[str, int] = {}
+        for turn in turns:
+            if turn.speaker:
+                self._words[turn.speaker] = self._words.get(turn.speaker, 0) + len(turn.text.split())
+                self._turns[turn.speaker] = self._turns.get(turn.speaker, 0) + 1
+        self._index = BM25Index([
+            [_speaker_term(s) for s in p.speakers] + tokenize(p.text) for p in self.passages
+        ])
+
+    def overview(self) -> str:
+        """Short global overview: size, time span and participants."""
+        lines = [f"- Length: ~{self.tokens:,} tokens in {len(self.passages)} passages"]
+        start = next((p.start for p in self.passages if p.start), None)
+        end = next((p.end for p in reversed(self.passages) if p.end), None)
+        if start and end:
+            lines.append(f"- Time span: {start} – {end}")
+        if self.speakers:
+            total = sum(self._words.values()) or 1
+            lines.append("- Speakers: " + ", ".join(
+                f"{s} ({self._turns[s]} turns, {round(100 * self._words[s] / total)}% of words)"
+                for s in self.speakers
+            ))
+        return "\n".join(lines)
+
+    def select(self, query: dict[str, float], question: str, token_budget: int) -> list[TranscriptPassage]:
+        """Most relevant passages within ``token_budget``, in transcript order.
+
+        The latest passages are always included. Speakers named in
+        ``question`` are added to the query. Without any lexical match
+        (e.g. "summarize the meeting") passages are sampled evenly across
+        the transcript instead.
+        """
+        query = dict(query)
+        lowered = question.lower()
+        for speaker in self.speakers:
+            if speaker.lower() in lowered:
+                query[_speaker_term(speaker)] = query.get(_speaker_term(speaker), 0.0) + 1.0
+
+        chosen: dict[int, TranscriptPassage] = {}
+        used = 0
+
+        def take(passage: TranscriptPassage) -> None:
+            nonlocal used
+            if passage.position not in chosen and used + passage.tokens <= token_budget:
+                chosen[passage.position] = passage
+                used += passage.tokens
+
+        for passage in self.passages[-RECENT_PASSAGES:]:
+            take(passage)
+        ranked = self._index.top(query, len(self.passages))
+        for i, score in ranked:
+            if score < ranked[0][1] * MIN_RELATIVE_SCORE:
+                break
+            take(self.passages[i])
+        if not ranked and self.passages:
+            average = max(sum(p.tokens for p in self.passages) // len(self.passages), 1)
+            step = max(len(self.passages) // max(token_budget // average, 1), 1)
+            for passage in self.passages[::step]:
+                take(passage)
+        return [chosen[i] for i in sorted(chosen)]
+
+
+@lru_cache(maxsize=16)
+def get_transcript_index(transcript: str) -> TranscriptIndex:
+    """Index for a transcript; follow-up turns usually resend the same text."""
+    return TranscriptIndex(transcript)
+
+
+def format_passages(passages: list[TranscriptPassage]) -> str:
+    """Passages in order, with a marker wherever transcript text was left out."""
+    parts = []
+    previous = -1
+    for passage in passages:
+        if passage.position != previous + 1:
+            parts.append("[…]")
+        parts.append(passage.text)
+        previous = passage.position
+    return "\n\n".join(parts)
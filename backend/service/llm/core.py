@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from typing import Union, AsyncGenerator
 
@@ -14,6 +15,8 @@ from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.providers.google import GoogleProvider
 
 from models.llm import LLMProvider, AzureConfig, LangdockConfig, CreateSummaryRequest, ExtractKeyPointsRequest, ExtractKeyPointsResponse, TestLLMRequest, GenerateTitleRequest, TokenUsage
+from config import config
+from service.llm.key_points import partition_by_speaker
 from service.misc.core import MiscService
 
 
@@ -56,6 +59,23 @@ class _SpeakerKeyPointsWithNamesResult(PydanticBaseModel):
         ..., description="Key point summaries with optional identified names for each speaker")
 
 
+class _SingleSpeakerKeyPoints(PydanticBaseModel):
+    summary: str = PydanticField(
+        ..., description="1-3 sentence key point summary for this speaker")
+
+
+class _SpeakerName(PydanticBaseModel):
+    speaker: str = PydanticField(...,
+                                 description="Speaker label (e.g. 'Speaker A')")
+    identified_name: str = PydanticField(
+        "", description="The real name of this speaker if clearly and explicitly mentioned in the transcript. Leave empty if not identifiable.")
+
+
+class _SpeakerNamesResult(PydanticBaseModel):
+    entries: list[_SpeakerName] = PydanticField(
+        ..., description="Identified names for each speaker")
+
+
 helper = MiscService()
 
 
@@ -259,6 +279,14 @@ class LLMService:
             langdock_config=request.langdock_config
         )
 
+        per_speaker = request.per_speaker if request.per_speaker is not None else config.key_points_per_speaker
+        if per_speaker and len(request.speakers) > 1:
+            shared_context, excerpts = partition_by_speaker(request.transcript, request.speakers)
+            # Transcripts without recognizable speaker labels fall back to a single call
+            if excerpts:
+                return await self._extract_key_points_per_speaker(
+                    request, model, model_name, shared_context, excerpts)
+
         speakers_list = ", ".join(request.speakers)
         system_prompt = (
             "You are an assistant that analyzes meeting transcripts. "
@@ -303,6 +331,84 @@ class LLMService:
 
         return ExtractKeyPointsResponse(key_points=key_points, speaker_labels=speaker_labels)
 
+    async def _extract_key_points_per_speaker(
+        self, request: ExtractKeyPointsRequest, model, model_name: str,
+        shared_context: str, excerpts: dict[str, str],
+    ) -> ExtractKeyPointsResponse:
+        """One smaller call per speaker (their turns plus shared context), at most KEY_POINTS_MAX_CONCURRENCY at a time.
+
+        Names are identified in one extra call over the full transcript,
+        since people are usually named by the others rather than in their own turns.
+        """
+        system_prompt = (
+            "You are an assistant that analyzes meeting transcripts. "
+            "You get the opening of a meeting and all turns of one speaker; lines marked (context) are what "
+            "another participant said just before and are NOT the speaker's own words. "
+            "Provide a 1-3 sentence summary of this speaker's key points and contributions: what they talked "
+            "about, their main arguments, and any decisions they made."
+        )
+        settings = self.build_model_settings(request.provider, model_name, temperature=0.3)
+        agent = Agent(
+            model,
+            system_prompt=system_prompt,
+            output_type=_SingleSpeakerKeyPoints,
+            model_settings=settings
+        )
+        names_agent = Agent(
+            model,
+            system_prompt=(
+                "You are an assistant that analyzes meeting transcripts. "
+                "For each speaker listed, try to identify their real name from the transcript. "
+                "Only provide a name if it is clearly and explicitly mentioned "
+                "(e.g., someone addresses them by name, they introduce themselves). "
+                "Do NOT guess, infer, or hallucinate names. "
+                "If a speaker's name is not clearly identifiable, leave identified_name as an empty string."
+            ),
+            output_type=_SpeakerNamesResult,
+            model_settings=settings
+        )
+        semaphore = asyncio.Semaphore(config.key_points_max_concurrency)
+
+        async def extract(speaker: str) -> _SingleSpeakerKeyPoints:
+            async with semaphore:
+                result = await agent.run(
+                    f"Meeting opening (shared context):\n{shared_context}\n\n"
+                    f"Speaker: {speaker}\n\n"
+                    f"Turns of {speaker}:\n{excerpts[speaker]}"
+                )
+                return result.output
+
+        async def identify() -> _SpeakerNamesResult:
+            async with semaphore:
+                result = await names_agent.run(
+                    f"Speakers: {', '.join(request.speakers)}\n\n"
+                    f"Transcript:\n{request.transcript}"
+                )
+                return result.output
+
+        speakers = [s for s in request.speakers if s in excerpts]
+        names_task = None
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = {speaker: group.create_task(extract(speaker)) for speaker in speakers}
+                if request.identify_speakers:
+                    names_task = group.create_task(identify())
+        except ExceptionGroup as eg:
+            # The first failure cancels the other calls; re-raise it bare so
+            # the router maps provider errors (401, 404, ...) as for one call
+            raise eg.exceptions[0]
+
+        # Speakers without any turn get an empty entry, which the frontend leaves out
+        key_points = {speaker: "" for speaker in request.speakers}
+        for speaker, task in tasks.items():
+            key_points[speaker] = task.result().summary
+        speaker_labels = {}
+        if names_task is not None:
+            for entry in names_task.result().entries:
+                if entry.speaker in key_points and entry.identified_name:
+                    speaker_labels[entry.speaker] = entry.identified_name
+        return ExtractKeyPointsResponse(key_points=key_points, speaker_labels=speaker_labels)
+
     async def _generate_title(
         self, model, provider: LLMProvider, model_name: str,
         transcript: str, target_language: str, date: datetime.date | None = None,
@@ -0,0 +1,31 @@
+from service.chatbot.transcript import SpeakerTurn, split_turns
+
+SHARED_CONTEXT_CHARS = 1500  # opening of the meeting, sent with every speaker (introductions, agenda)
+REPLY_CONTEXT_CHARS = 300  # preceding turn of another speaker, shown before each of the speaker's turns
+
+
+def _clip(text: str, limit: int, tail: bool = False) -> str:
+    if len(text) <= limit:
+        return text
+    return "…" + text[-limit:] if tail else text[:limit] + "…"
+
+
+def partition_by_speaker(transcript: str, speakers: list[str]) -> tuple[str, dict[str, str]]:
+    """Shared opening context plus, per speaker, their turns with the turn each one replied to.
+
+    Returns ``(shared_context, {speaker: excerpt})``; speakers without any
+    turn are missing from the mapping. One pass over the transcript.
+    """
+    turns = split_turns(transcript, speakers)
+    excerpts: dict[str, list[str]] = {}
+    previous: SpeakerTurn | None = None
+    for turn in turns:
+        if turn.speaker is not None:
+            parts = excerpts.setdefault(turn.speaker, [])
+            if previous is not None and previous.speaker != turn.speaker:
+                context = _clip(previous.text, REPLY_CONTEXT_CHARS, tail=True)
+                parts.extend(f"(context) {line}" for line in context.splitlines())
+            parts.append(turn.text)
+        previous = turn
+    return _clip(transcript.strip(), SHARED_CONTEXT_CHARS), {
+        speaker: "\n".join(parts) for speaker, parts in excerpts.items()}
@@ -0,0 +1,99 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from service.realtime.sender import BrowserSender
+
+
+class SubscriberLimitError(Exception):
+    """Raised when a session cannot take another subscriber (full or already ended)."""
+
+
+@dataclass(eq=False)
+class Subscriber:
+    sender: BrowserSender
+    # Finals with a lower turn_index were already part of the subscriber's snapshot
+    next_turn: int = 0
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    # Why the subscription ended: "ended" (session over) or "lagging" (evicted)
+    reason: str = ""
+
+
+class SessionBroadcast:
+    """Fans out one session's outbound messages to its owner and read-only subscribers.
+
+    Exposes the part of the ``BrowserSender`` interface the relay uses, so
+    the single AssemblyAI stream of a session feeds any number of viewers.
+    Every subscriber has its own ``BrowserSender`` (own queue, partial
+    dropping, rate limit and delta encoder), so a slow viewer never delays
+    the owner or other viewers. A subscriber whose queue still reaches
+    ``max_queue`` is evicted; it can reconnect and catch up from a snapshot.
+    """
+
+    def __init__(self, owner: BrowserSender, max_subscribers: int = 20, max_queue: int = 256) -> None:
+        self._owner = owner
+        self._max_subscribers = max_subscribers
+        self._max_queue = max_queue
+        self._subscribers: list[Subscriber] = []
+        self._closed = False
+        self.evicted_subscribers = 0
+
+    @property
+    def failed(self) -> bool:
+        """True when the owner's browser connection is gone."""
+        return self._owner.failed
+
+    def subscribe(self, sender: BrowserSender, next_turn: int = 0) -> Subscriber:
+        if self._closed:
+            raise SubscriberLimitError("Session has ended")
+        if len(self._subscribers) >= self._max_subscribers:
+            raise SubscriberLimitError(f"Session accepts at most {self._max_subscribers} subscribers")
+        subscriber = Subscriber(sender=sender, next_turn=next_turn)
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    def send(self, message: dict) -> None:
+        self._owner.send(message)
+        turn_index = message.get("turn_index") if message.get("is_final") else None
+        for subscriber in self._live_subscribers():
+            if turn_index is not None and turn_index < subscriber.next_turn:
+                continue
+            subscriber.sender.send(message)
+
+    def send_partial(self, message: dict, throttle: bool = False) -> None:
+        self._owner.send_partial(message, throttle=throttle)
+        for subscriber in self._live_subscribers():
+            subscriber.sender.send_partial(message, throttle=throttle)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "evicted_subscribers": self.evicted_subscribers,
+        }
+
+    def close(self) -> None:
+        """End every subscription (the session is over)."""
+        self._closed = True
+        for subscriber in self._subscribers:
+            subscriber.reason = subscriber.reason or "ended"
+            subscriber.done.set()
+        self._subscribers.clear()
+
+    def _live_subscribers(self) -> list[Subscriber]:
+        """Drop subscribers that disconnected or fell too far behind."""
+        live = []
+        for subscriber in self._subscribers:
+            if subscriber.sender.failed:
+                subscriber.done.set()
+            elif subscriber.sender.queue_depth >= self._max_queue:
+                subscriber.reason = "lagging"
+                subscriber.done.set()
+                self.evicted_subscribers += 1
+            else:
+                live.append(subscriber)
+        if len(live) != len(self._subscribers):
+            self._subscribers = live
+        return live
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import tempfile
+import time
+import wave
+from dataclasses import dataclass
+
+from config import config
+from service.realtime.session import api_key_hash
+from utils.logging import logger
+
+COPY_FRAMES = 1 << 18  # frames per read when joining captures
+
+
+class AudioCapture:
+    """Spools a session's incoming PCM frames to a temporary WAV file.
+
+    ``write()`` only appends to an in-memory buffer; a single writer task
+    drains it with the actual file writes running in a worker thread, so
+    disk I/O never blocks the event loop and frames stay in order. The
+    WAV header is completed when the capture is closed.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        fd, self.path = tempfile.mkstemp(prefix="realtime-capture-", suffix=".wav")
+        os.close(fd)
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+        self.sample_rate = sample_rate
+        self._pending = bytearray()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self.bytes_written = 0
+
+    @property
+    def duration_ms(self) -> int:
+        return int(self.bytes_written / (self.sample_rate * 2) * 1000)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def write(self, data: bytes) -> None:
+        if self._closing:
+            return
+        self._pending += data
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        """Flush buffered frames and finalize the WAV file."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                logger.warning(f"Audio capture writer failed: {e}")
+        await asyncio.to_thread(self._wav.close)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            chunk, self._pending = bytes(self._pending), bytearray()
+            await asyncio.to_thread(self._wav.writeframesraw, chunk)
+            self.bytes_written += len(chunk)
+
+
+@dataclass
+class CapturedAudio:
+    path: str
+    key_hash: str
+    sample_rate: int
+    duration_ms: int
+    created_at: float
+
+
+class CaptureStore:
+    """Finished session captures waiting for batch transcription.
+
+    A capture can only be claimed with the AssemblyAI key that recorded it.
+    A session id that is started again (reconnect, reload) keeps its
+    capture: the new recording is appended when the session ends. Captures
+    that are not transcribed within ``ttl_seconds`` are deleted.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._captures: dict[str, CapturedAudio] = {}
+        self._recording: set[str] = set()
+
+    def begin(self, session_id: str, sample_rate: int) -> AudioCapture:
+        self._evict_expired()
+        capture = AudioCapture(sample_rate)
+        self._recording.add(session_id)
+        return capture
+
+    async def finish(self, session_id: str, capture: AudioCapture, api_key: str) -> None:
+        """Close a session's capture and make it available for transcription.
+
+        The session counts as recording until a resumed capture has been
+        joined to the earlier one.
+        """
+        try:
+            await capture.close()
+            await self._store(session_id, capture, api_key)
+        finally:
+            self._recording.discard(session_id)
+
+    async def _store(self, session_id: str, capture: AudioCapture, api_key: str) -> None:
+        if not capture.bytes_written:
+            _remove(capture.path)
+            return
+        key_hash = api_key_hash(api_key)
+        path, duration_ms = capture.path, capture.duration_ms
+        previous = self._captures.get(session_id)
+        if previous is not None and previous.key_hash != key_hash:
+            logger.warning(f"Session {session_id} was captured with another AssemblyAI key, dropping new audio")
+            _remove(path)
+            return
+        if previous is not None and previous.sample_rate == capture.sample_rate:
+            try:
+                path = await asyncio.to_thread(_join_wav, previous.path, capture.path)
+                duration_ms += previous.duration_ms
+            except Exception as e:
+                logger.warning(f"Could not append to captured audio of session {session_id}: {e}")
+                _remove(path)
+                return
+        elif previous is not None:
+            logger.warning(f"Sample rate of session {session_id} changed, replacing its captured audio")
+            _remove(previous.path)
+        self._captures[session_id] = CapturedAudio(
+            path=path,
+            key_hash=key_hash,
+            sample_rate=capture.sample_rate,
+            duration_ms=duration_ms,
+            created_at=time.monotonic(),
+        )
+        logger.info(f"Captured {duration_ms} ms of audio for session {session_id}")
+
+    def is_recording(self, session_id: str) -> bool:
+        return session_id in self._recording
+
+    def get(self, session_id: str, api_key: str) -> CapturedAudio | None:
+        self._evict_expired()
+        captured = self._captures.get(session_id)
+        if captured is None or captured.key_hash != api_key_hash(api_key):
+            return None
+        return captured
+
+    def discard(self, session_id: str) -> None:
+        captured = self._captures.pop(session_id, None)
+        if captured is not None:
+            _remove(captured.path)
+
+    def clear(self) -> None:
+        for session_id in list(self._captures):
+            self.discard(session_id)
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self._ttl_seconds
+        for sid in [s for s, c in self._captures.items() if c.created_at < cutoff]:
+            self.discard(sid)
+
+
+def _join_wav(first: str, second: str) -> str:
+    """Append the frames of WAV file ``second`` to ``first``; returns the joined file's path.
+
+    ``wave`` cannot reopen a file for appending, so both are copied into a
+    new file in chunks; the inputs are deleted once it is complete.
+    """
+    fd, path = tempfile.mkstemp(prefix="realtime-capture-", suffix=".wav")
+    os.close(fd)
+    try:
+        with wave.open(path, "wb") as out:
+            for source in (first, second):
+                with wave.open(source, "rb") as wav:
+                    if source == first:
+                        out.setparams(wav.getparams())
+                    while frames := wav.readframes(COPY_FRAMES):
+                        out.writeframesraw(frames)
+    except BaseException:
+        _remove(path)
+        raise
+    _remove(first)
+    _remove(second)
+    return path
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError as e:
+        logger.warning(f"Could not delete captured audio {path}: {e}")
+
+
+capture_store = CaptureStore(ttl_seconds=config.realtime_capture_ttl_seconds)
@@ -1,14 +1,211 @@
+import asyncio
 import json
+import time
 import urllib.parse
+from dataclasses import dataclass, field
 
 import websockets
+from websockets.protocol import State
 
+from config import config
+from service.realtime.session import api_key_hash
 from utils.logging import logger
 
 AAI_STREAMING_URL = "wss://streaming.eu.assemblyai.com/v3/ws"
 
+BEGIN_TIMEOUT = 10
+DEMAND_WINDOW_SECONDS = 600  # a key is only pre-warmed for if it acquired a connection this recently
+
+
+def _pool_key(api_key: str, sample_rate: int, speech_model: str) -> tuple[str, int, str]:
+    """Pool bucket for a connection; the API key is only kept as a hash."""
+    return (api_key_hash(api_key), sample_rate, speech_model)
+
+
+@dataclass
+class _IdleConnection:
+    ws: websockets.WebSocketClientProtocol
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class RealtimeConnectionPool:
+    """Small pool of pre-connected, idle AssemblyAI streaming sessions.
+
+    Connections are bucketed by (API key hash, sample rate, speech model)
+    and are already past the ``Begin`` handshake when they are handed out.
+    Each bucket holds at most ``size`` idle connections; an idle connection
+    is terminated after ``idle_seconds`` (AssemblyAI bills open sessions)
+    and the websocket's own ping frames keep it alive until then. Streaming
+    sessions are single-use, so a connection that has been acquired is
+    never returned to the pool. Since idle connections are billed, buckets
+    are only filled on demand: for keys that acquired a connection within
+    ``DEMAND_WINDOW_SECONDS`` (reconnects, back-to-back sessions), never
+    for a key's first session.
+    """
+
+    def __init__(self, size: int = 0, idle_seconds: float = 60) -> None:
+        self._size = size
+        self._idle_seconds = idle_seconds
+        self._idle: dict[tuple, list[_IdleConnection]] = {}
+        self._warming: dict[tuple, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._last_acquire: dict[tuple, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0
+
+    def in_demand(self, key: tuple) -> bool:
+        last = self._last_acquire.get(key)
+        return last is not None and time.monotonic() - last < DEMAND_WINDOW_SECONDS
+
+    def record_acquire(self, key: tuple) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        for stale in [k for k, t in self._last_acquire.items() if now - t >= DEMAND_WINDOW_SECONDS]:
+            del self._last_acquire[stale]
+        self._last_acquire[key] = now
+
+    def take(self, key: tuple) -> websockets.WebSocketClientProtocol | None:
+        """Pop a live idle connection for ``key``, discarding stale ones."""
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            fresh = time.monotonic() - conn.created_at < self._idle_seconds
+            if fresh and conn.ws.state is State.OPEN:
+                return conn.ws
+            self._spawn(self._close(conn.ws))
+        return None
+
+    def warm(self, key: tuple, connect) -> None:
+        """Top up the bucket for ``key`` in the background if the key is in demand.
+
+        ``connect`` is a zero-argument coroutine factory opening a new
+        connection. It closes over the API key, which is therefore held
+        until that connection is open and dropped before it sits idle;
+        buckets themselves only know the key's hash.
+        """
+        if not self.enabled or not self.in_demand(key):
+            return
+        missing = self._size - len(self._idle.get(key, ())) - self._warming.get(key, 0)
+        for _ in range(max(missing, 0)):
+            self._warming[key] = self._warming.get(key, 0) + 1
+            self._spawn(self._warm_one(key, connect))
+
+    async def close(self) -> None:
+        """Cancel pending warm-ups and terminate every idle connection."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _warm_one(self, key: tuple, connect) -> None:
+        ws = None
+        try:
+            ws = await connect()
+            connect = None  # drop the API key before idling
+            async with asyncio.timeout(BEGIN_TIMEOUT):
+                while True:
+                    event = json.loads(await ws.recv())
+                    if event.get("type") == "Begin":
+                        break
+                    if event.get("type") == "Error":
+                        raise RuntimeError(event.get("error", "Unknown AssemblyAI error"))
+        except asyncio.CancelledError:
+            if ws is not None:
+                await self._close(ws)
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to pre-warm AssemblyAI connection: {e}")
+            if ws is not None:
+                await self._close(ws)
+            return
+        finally:
+            self._warming[key] -= 1
+            if not self._warming[key]:
+                del self._warming[key]
+
+        conn = _IdleConnection(ws)
+        self._idle.setdefault(key, []).append(conn)
+        try:
+            await asyncio.sleep(self._idle_seconds)
+        finally:
+            idle = self._idle.get(key)
+            if idle and conn in idle:
+                idle.remove(conn)
+                if not idle:
+                    del self._idle[key]
+                await self._close(ws)
+                logger.debug("Expired idle pre-warmed AssemblyAI connection")
+
+    @staticmethod
+    async def _close(ws) -> None:
+        try:
+            await ws.send(json.dumps({"type": "Terminate"}))
+            await ws.close()
+        except Exception:
+            pass
+
+
+connection_pool = RealtimeConnectionPool(
+    size=config.realtime_pool_size,
+    idle_seconds=config.realtime_pool_idle_seconds,
+)
+
 
 class RealtimeTranscriptionService:
+    async def acquire(
+        self, api_key: str, sample_rate: int = 16000, speech_model: str = "precise",
+        keyterms_prompt: list[str] | None = None,
+    ) -> tuple[websockets.WebSocketClientProtocol, bool]:
+        """Return a streaming connection, taking a pre-warmed one when available.
+
+        The second element is True when the connection came from the pool;
+        its ``Begin`` event has then already been consumed. Keyterms are
+        applied to pooled connections with an ``UpdateConfiguration`` message
+        since they are not part of the pool key. The pool is refilled in the
+        background for the next session if this key already acquired one
+        recently, so one-off sessions never leave a billed idle connection.
+        """
+        key = _pool_key(api_key, sample_rate, speech_model)
+        refill = connection_pool.in_demand(key)
+        connection_pool.record_acquire(key)
+        ws = connection_pool.take(key)
+        if ws is not None and keyterms_prompt:
+            try:
+                await ws.send(json.dumps({
+                    "type": "UpdateConfiguration",
+                    "keyterms_prompt": keyterms_prompt[:100],
+                }))
+            except Exception as e:
+                logger.warning(f"Discarding pre-warmed connection: {e}")
+                ws = None
+        if ws is None:
+            ws = await self.connect(api_key, sample_rate, speech_model, keyterms_prompt)
+            pooled = False
+        else:
+            logger.info(f"Using pre-warmed AssemblyAI connection (sample_rate={sample_rate})")
+            pooled = True
+        if refill:
+            self.prewarm(api_key, sample_rate, speech_model)
+        return ws, pooled
+
+    def prewarm(self, api_key: str, sample_rate: int = 16000, speech_model: str = "precise") -> None:
+        """Start opening idle connections so the next ``acquire`` is instant.
+
+        Only keys that acquired a connection recently are pre-warmed.
+        """
+        connection_pool.warm(
+            _pool_key(api_key, sample_rate, speech_model),
+            lambda: self.connect(api_key, sample_rate, speech_model),
+        )
+
     async def connect(
         self, api_key: str, sample_rate: int = 16000, speech_model: str = "precise",
         keyterms_prompt: list[str] | None = None,
@@ -0,0 +1,65 @@
+PROTOCOL_VERSION_FULL = 1
+PROTOCOL_VERSION_DELTA = 2
+
+
+def negotiate_protocol(requested) -> int:
+    """Return the transcript protocol version to use for a client's request."""
+    try:
+        version = int(requested)
+    except (TypeError, ValueError):
+        return PROTOCOL_VERSION_FULL
+    return PROTOCOL_VERSION_DELTA if version >= PROTOCOL_VERSION_DELTA else PROTOCOL_VERSION_FULL
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    if b.startswith(a):
+        return len(a)
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class PartialDeltaEncoder:
+    """Delta-encodes successive partial ``turn`` messages (protocol version 2).
+
+    Each partial is sent as ``{"delta": {"keep": n, "text": s}}``: the client
+    keeps the first ``n`` characters of the partial it last received and
+    appends ``s``. A full ``transcript`` with ``"resync": true`` is sent for
+    the first partial of a turn, when nothing is shared with the previous
+    partial, and every ``resync_every`` partials. Finals are always sent in
+    full and end the turn.
+
+    Must be applied to messages in the order they are delivered, after any
+    dropping or coalescing, so deltas match what the client actually has.
+    """
+
+    def __init__(self, resync_every: int = 20) -> None:
+        self._resync_every = resync_every
+        self._last = ""
+        self._since_resync = 0
+
+    def encode(self, message: dict) -> dict:
+        if message.get("type") != "turn":
+            return message
+        if message.get("is_final"):
+            self.reset()
+            return message
+
+        text = message.get("transcript", "")
+        keep = _common_prefix_len(self._last, text) if self._last else 0
+        self._last = text
+
+        if keep == 0 or self._since_resync >= self._resync_every:
+            self._since_resync = 0
+            return {**message, "resync": True}
+
+        self._since_resync += 1
+        encoded = {k: v for k, v in message.items() if k != "transcript"}
+        encoded["delta"] = {"keep": keep, "text": text[keep:]}
+        return encoded
+
+    def reset(self) -> None:
+        self._last = ""
+        self._since_resync = 0
@@ -0,0 +1,185 @@
+import bisect
+import time
+
+from service.realtime.sender import BrowserSender
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket histogram of millisecond values (constant memory, O(log buckets) per sample)."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self._bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self._bounds[i], self.max) if i < len(self._bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [str(b) for b in self._bounds] + ["+Inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5), 1),
+            "p95_ms": round(self.quantile(0.95), 1),
+            "p99_ms": round(self.quantile(0.99), 1),
+            "max_ms": round(self.max, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RelayMetrics:
+    """Counters and histograms of one ``/ws/realtime`` relay.
+
+    Updated inline by the relay (plain attribute increments, no locking:
+    everything runs on the event loop). Partial drop counts are read from
+    the session's ``BrowserSender`` instead of being counted twice.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self.ended_at: float | None = None
+        self.audio_bytes_in = 0
+        self.audio_frames_in = 0
+        self.reconnect_attempts = 0
+        self.reconnects = 0
+        self.reconnect_seconds = 0.0
+        self.partials_dropped = 0
+        # AAI event handed to the browser queue -> written to the browser socket
+        self.event_latency = Histogram()
+        # First formatted final of a turn -> debounced final sent
+        self.debounce_delay = Histogram()
+        self.sender: BrowserSender | None = None
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+    def record_audio(self, frame: bytes) -> None:
+        self.audio_bytes_in += len(frame)
+        self.audio_frames_in += 1
+
+    def dropped_partials(self) -> int:
+        if self.sender is None:
+            return self.partials_dropped
+        return self.sender.dropped_partials + self.sender.coalesced_partials
+
+    def finish(self) -> None:
+        self.ended_at = time.monotonic()
+        self.partials_dropped = self.dropped_partials()
+        self.sender = None
+
+    def to_dict(self, duration: float | None = None) -> dict:
+        """Plain-dict view; ``duration`` overrides the wall-clock span (used for totals)."""
+        if duration is None:
+            duration = self.duration_seconds
+        return {
+            "duration_seconds": round(duration, 1),
+            "audio_bytes_in": self.audio_bytes_in,
+            "audio_frames_in": self.audio_frames_in,
+            "frames_per_second": round(self.audio_frames_in / duration, 1) if duration > 0 else 0.0,
+            "partials_dropped": self.dropped_partials(),
+            "reconnect_attempts": self.reconnect_attempts,
+            "reconnects": self.reconnects,
+            "reconnect_seconds": round(self.reconnect_seconds, 2),
+            "event_latency": self.event_latency.to_dict(),
+            "debounce_delay": self.debounce_delay.to_dict(),
+        }
+
+
+class RelayMetricsRegistry:
+    """Aggregates relay metrics of this worker: live sessions plus totals of ended ones."""
+
+    def __init__(self) -> None:
+        self._started_at = time.monotonic()
+        self._active: set[RelayMetrics] = set()
+        self._ended = RelayMetrics()
+        self._ended_duration = 0.0
+        self.sessions_started = 0
+
+    def start(self) -> RelayMetrics:
+        metrics = RelayMetrics()
+        self._active.add(metrics)
+        self.sessions_started += 1
+        return metrics
+
+    def finish(self, metrics: RelayMetrics) -> None:
+        """Fold an ended session into the totals."""
+        if metrics not in self._active:
+            return
+        self._active.discard(metrics)
+        metrics.finish()
+        ended = self._ended
+        ended.audio_bytes_in += metrics.audio_bytes_in
+        ended.audio_frames_in += metrics.audio_frames_in
+        ended.reconnect_attempts += metrics.reconnect_attempts
+        ended.reconnects += metrics.reconnects
+        ended.reconnect_seconds += metrics.reconnect_seconds
+        ended.partials_dropped += metrics.partials_dropped
+        ended.event_latency.merge(metrics.event_latency)
+        ended.debounce_delay.merge(metrics.debounce_delay)
+        self._ended_duration += metrics.duration_seconds
+
+    def snapshot(self) -> dict:
+        totals = RelayMetrics()
+        totals.event_latency.merge(self._ended.event_latency)
+        totals.debounce_delay.merge(self._ended.debounce_delay)
+        duration = self._ended_duration
+        audio_bytes_per_second = 0.0
+        frames_per_second = 0.0
+        for source in (self._ended, *self._active):
+            totals.audio_bytes_in += source.audio_bytes_in
+            totals.audio_frames_in += source.audio_frames_in
+            totals.reconnect_attempts += source.reconnect_attempts
+            totals.reconnects += source.reconnects
+            totals.reconnect_seconds += source.reconnect_seconds
+            totals.partials_dropped += source.dropped_partials()
+        for metrics in self._active:
+            totals.event_latency.merge(metrics.event_latency)
+            totals.debounce_delay.merge(metrics.debounce_delay)
+            session_duration = metrics.duration_seconds
+            duration += session_duration
+            if session_duration > 0:
+                audio_bytes_per_second += metrics.audio_bytes_in / session_duration
+                frames_per_second += metrics.audio_frames_in / session_duration
+        return {
+            "uptime_seconds": round(time.monotonic() - self._started_at, 1),
+            "process_cpu_seconds": round(time.process_time(), 2),
+            "active_sessions": len(self._active),
+            "sessions_started": self.sessions_started,
+            "audio_bytes_per_second": round(audio_bytes_per_second, 1),
+            "frames_per_second": round(frames_per_second, 1),
+            # Summed over sessions: rates are per session-second
+            "totals": totals.to_dict(duration),
+        }
+
+
+relay_metrics = RelayMetricsRegistry()
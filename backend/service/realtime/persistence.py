@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from config import config
+from db.engine import AsyncSessionLocal
+from db.models import RealtimeTurn
+from service.realtime.session import TranscriptTurn
+from utils.logging import logger
+
+MAX_PENDING_TURNS = 10_000
+CLEANUP_INTERVAL = 3600  # seconds between retention sweeps
+
+
+class TurnStore:
+    """Append-only, batched persistence of finalized realtime turns.
+
+    ``append()`` never touches the database: turns are queued in memory and
+    written by one background task as a single multi-row insert, every
+    ``flush_interval`` seconds or as soon as ``batch_size`` turns are
+    pending. Inserts ignore ``(session_id, turn_index)`` duplicates, so a
+    failed batch can simply be retried. Each turn is stored with the hash
+    of the AssemblyAI key that streamed it, the proof of ownership for
+    reading or resuming the transcript. Turns older than
+    ``retention_hours`` are deleted periodically.
+    """
+
+    def __init__(self, flush_interval: float = 3.0, batch_size: int = 50, retention_hours: float = 24) -> None:
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._retention = timedelta(hours=retention_hours)
+        self._pending: list[tuple[str, str, TranscriptTurn]] = []  # (session_id, key_hash, turn)
+        self._in_flight: list[tuple[str, str, TranscriptTurn]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_cleanup = 0.0
+
+    def append(self, session_id: str, key_hash: str, turn: TranscriptTurn) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._pending.append((session_id, key_hash, turn))
+        if len(self._pending) > MAX_PENDING_TURNS:
+            dropped = len(self._pending) - MAX_PENDING_TURNS
+            del self._pending[:dropped]
+            logger.warning(f"Turn persistence is falling behind, dropped {dropped} unsaved turn(s)")
+        if len(self._pending) >= self._batch_size:
+            self._wakeup.set()
+
+    async def load(self, session_id: str) -> tuple[str, list[TranscriptTurn]]:
+        """Owner key hash and persisted turns of a session, including ones not flushed yet.
+
+        The key hash is empty when the session has no turns.
+        """
+        owner = ""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(RealtimeTurn)
+                .where(RealtimeTurn.session_id == session_id)
+                .order_by(RealtimeTurn.turn_index)
+            )
+            turns = {}
+            for row in result.scalars():
+                owner = row.key_hash
+                turns[row.turn_index] = TranscriptTurn(
+                    index=row.turn_index,
+                    text=row.text,
+                    speaker_label=row.speaker_label,
+                    start_ms=row.start_ms,
+                    end_ms=row.end_ms,
+                )
+        for sid, key_hash, turn in self._in_flight + self._pending:
+            if sid == session_id:
+                owner = key_hash
+                turns[turn.index] = turn
+        return owner, [turns[i] for i in sorted(turns)]
+
+    async def close(self) -> None:
+        """Stop the writer after a final flush."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with asyncio.timeout(self._flush_interval):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+            if time.monotonic() - self._last_cleanup > CLEANUP_INTERVAL:
+                await self._cleanup()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        rows = [
+            {
+                "session_id": sid,
+                "key_hash": key_hash,
+                "turn_index": turn.index,
+                "text": turn.text,
+                "speaker_label": turn.speaker_label,
+                "start_ms": turn.start_ms,
+                "end_ms": turn.end_ms,
+            }
+            for sid, key_hash, turn in batch
+        ]
+        self._in_flight = batch
+        committed = False
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    insert(RealtimeTurn).values(rows)
+                    .on_conflict_do_nothing(index_elements=["session_id", "turn_index"])
+                )
+                await db.commit()
+            committed = True
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(batch)} realtime turn(s), will retry: {e}")
+        finally:
+            self._in_flight = []
+            if not committed:
+                self._pending = batch + self._pending
+
+    async def _cleanup(self) -> None:
+        self._last_cleanup = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - self._retention
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(RealtimeTurn).where(RealtimeTurn.created_at < cutoff))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to delete expired realtime turns: {e}")
+
+
+def create_turn_store() -> TurnStore | None:
+    """The turn store if ``REALTIME_PERSIST_TURNS`` is on and a database is configured."""
+    if not config.realtime_persist_turns:
+        return None
+    if not config.database_url:
+        logger.warning("REALTIME_PERSIST_TURNS is set but DATABASE_URL is not — realtime turns are not persisted")
+        return None
+    return TurnStore(
+        flush_interval=config.realtime_persist_interval_seconds,
+        batch_size=config.realtime_persist_batch_size,
+        retention_hours=config.realtime_persist_retention_hours,
+    )
+
+
+turn_store = create_turn_store()
@@ -0,0 +1,160 @@
+import os
+import secrets
+import socket
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from config import config
+from db.engine import AsyncSessionLocal
+from db.models import RealtimeSession
+from utils.logging import logger
+
+# Identifies this process in the registry; unique per worker and host.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class SessionRecord:
+    session_id: str
+    owner: str
+    claim_id: str = ""
+    key_hash: str = ""  # owner's AssemblyAI key, so any worker can check access
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    heartbeat_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    stats: dict = field(default_factory=dict)
+
+
+class SessionRegistry:
+    """In-process registry of which worker owns which realtime session.
+
+    Only correct with a single worker; ``PostgresSessionRegistry`` shares
+    the same interface across workers and hosts. The owning worker claims
+    a session when its websocket starts, refreshes the record (with a stats
+    snapshot) every heartbeat, and releases it at the end. Each claim gets
+    a unique ``claim_id``; heartbeats and releases must present it, so a
+    connection that was taken over can no longer touch its successor's
+    record. Records whose heartbeat is older than ``stale_after`` seconds
+    belong to a worker that died and are treated as absent.
+    """
+
+    def __init__(self, stale_after: float = 30) -> None:
+        self._stale_after = timedelta(seconds=stale_after)
+        self._records: dict[str, SessionRecord] = {}
+
+    async def claim(self, session_id: str, key_hash: str) -> str | None:
+        """Make this worker the owner for the key with hash ``key_hash``; returns the claim id.
+
+        A record of this worker or a stale one is taken over. ``None`` if
+        another worker holds a live record.
+        """
+        record = self._records.get(session_id)
+        if record is not None and record.owner != WORKER_ID and not self._is_stale(record.heartbeat_at):
+            return None
+        claim_id = secrets.token_hex(8)
+        self._records[session_id] = SessionRecord(
+            session_id=session_id, owner=WORKER_ID, claim_id=claim_id, key_hash=key_hash)
+        return claim_id
+
+    async def heartbeat(self, session_id: str, claim_id: str, stats: dict) -> None:
+        record = self._records.get(session_id)
+        if record is not None and record.owner == WORKER_ID and record.claim_id == claim_id:
+            record.heartbeat_at = datetime.now(timezone.utc)
+            record.stats = stats
+
+    async def lookup(self, session_id: str) -> SessionRecord | None:
+        record = self._records.get(session_id)
+        if record is None or self._is_stale(record.heartbeat_at):
+            return None
+        return record
+
+    async def release(self, session_id: str, claim_id: str) -> None:
+        record = self._records.get(session_id)
+        if record is not None and record.owner == WORKER_ID and record.claim_id == claim_id:
+            del self._records[session_id]
+
+    def _is_stale(self, heartbeat_at: datetime) -> bool:
+        return datetime.now(timezone.utc) - heartbeat_at > self._stale_after
+
+
+class PostgresSessionRegistry(SessionRegistry):
+    """Session registry shared by all workers through the ``realtime_sessions`` table."""
+
+    async def claim(self, session_id: str, key_hash: str) -> str | None:
+        # One conditional upsert, so two workers racing for an id cannot both win
+        claim_id = secrets.token_hex(8)
+        async with AsyncSessionLocal() as db:
+            # Opportunistically drop records left behind by dead workers.
+            await db.execute(delete(RealtimeSession).where(
+                RealtimeSession.heartbeat_at < func.now() - self._stale_after))
+            stmt = insert(RealtimeSession).values(
+                session_id=session_id, owner=WORKER_ID, claim_id=claim_id, key_hash=key_hash, stats={})
+            result = await db.execute(stmt.on_conflict_do_update(
+                index_elements=[RealtimeSession.session_id],
+                set_={
+                    "owner": WORKER_ID,
+                    "claim_id": claim_id,
+                    "key_hash": key_hash,
+                    "stats": {},
+                    "created_at": func.now(),
+                    "heartbeat_at": func.now(),
+                },
+                where=or_(
+                    RealtimeSession.owner == WORKER_ID,
+                    RealtimeSession.heartbeat_at < func.now() - self._stale_after,
+                ),
+            ).returning(RealtimeSession.claim_id))
+            claimed = result.scalar_one_or_none()
+            await db.commit()
+        return claimed
+
+    async def heartbeat(self, session_id: str, claim_id: str, stats: dict) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(RealtimeSession)
+                .where(
+                    RealtimeSession.session_id == session_id,
+                    RealtimeSession.owner == WORKER_ID,
+                    RealtimeSession.claim_id == claim_id,
+                )
+                .values(heartbeat_at=func.now(), stats=stats)
+            )
+            await db.commit()
+
+    async def lookup(self, session_id: str) -> SessionRecord | None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(RealtimeSession).where(RealtimeSession.session_id == session_id))
+            row = result.scalar_one_or_none()
+        if row is None or self._is_stale(row.heartbeat_at):
+            return None
+        return SessionRecord(
+            session_id=row.session_id,
+            owner=row.owner,
+            claim_id=row.claim_id,
+            key_hash=row.key_hash,
+            created_at=row.created_at,
+            heartbeat_at=row.heartbeat_at,
+            stats=row.stats or {},
+        )
+
+    async def release(self, session_id: str, claim_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(RealtimeSession).where(
+                RealtimeSession.session_id == session_id,
+                RealtimeSession.owner == WORKER_ID,
+                RealtimeSession.claim_id == claim_id,
+            ))
+            await db.commit()
+
+
+def create_session_registry() -> SessionRegistry:
+    """Build the registry selected by ``REALTIME_SESSION_REGISTRY``."""
+    stale_after = config.realtime_registry_heartbeat_seconds * 3
+    if config.realtime_session_registry == "postgres":
+        if config.database_url:
+            return PostgresSessionRegistry(stale_after)
+        logger.warning("REALTIME_SESSION_REGISTRY=postgres but DATABASE_URL is not set — using in-process registry")
+    return SessionRegistry(stale_after)
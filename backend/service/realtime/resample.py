@@ -0,0 +1,106 @@
+from math import ceil, gcd
+
+import numpy as np
+
+ZERO_CROSSINGS = 16  # filter length in cutoff periods
+KAISER_BETA = 8.0
+PASSBAND = 0.9  # fraction of the lower Nyquist frequency kept
+
+
+def _design_filter(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass at the upsampled rate, as an (up, taps) phase table."""
+    taps = ceil(ZERO_CROSSINGS * max(up, down) / up)
+    n = up * taps
+    cutoff = PASSBAND * 0.5 / max(up, down)
+    t = np.arange(n) - (n - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, KAISER_BETA) * up
+    # phases[p, k] = h[p + k * up]
+    return h.reshape(taps, up).T.astype(np.float32)
+
+
+class StreamingResampler:
+    """Rational-ratio polyphase resampler for a continuous ``pcm_s16le`` stream.
+
+    Output sample ``n`` sits at index ``n * down`` of the ``up``-times
+    upsampled input and is computed directly from the matching filter phase
+    and the most recent input samples, for a whole chunk at once
+    (one gather + one multiply-accumulate). The tail of each chunk is kept
+    as history, so chunk boundaries do not affect the output.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int) -> None:
+        g = gcd(input_rate, output_rate)
+        self.up = output_rate // g
+        self.down = input_rate // g
+        self._phases = _design_filter(self.up, self.down)
+        taps = self._phases.shape[1]
+        self._taps = np.arange(taps)
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._consumed = 0  # input samples seen before the current chunk
+        self._next_out = 0  # index of the next output sample
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, pcm: bytes) -> bytes:
+        if self.passthrough:
+            return pcm
+        x = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2).astype(np.float32)
+        buf = np.concatenate((self._history, x))
+        total = self._consumed + len(x)
+
+        # Every output sample whose newest input sample is already available.
+        end = (total * self.up + self.down - 1) // self.down
+        n = np.arange(self._next_out, end, dtype=np.int64)
+        y = np.empty(0, dtype=np.float32)
+        if len(n):
+            pos = n * self.down
+            phase = pos % self.up
+            newest = pos // self.up - self._consumed + len(self._history)
+            window = buf[newest[:, None] - self._taps[None, :]]
+            y = np.einsum("ij,ij->i", window, self._phases[phase])
+            self._next_out = end
+
+        self._history = buf[len(buf) - len(self._history):].copy()
+        self._consumed = total
+        return np.clip(np.rint(y), -32768, 32767).astype("<i2").tobytes()
+
+    def flush(self) -> bytes:
+        """Output still held back by the filter delay, at the end of the stream.
+
+        The filter is centered on the newest input sample minus half its
+        length, so that many trailing samples only come out once silence
+        is pushed after them.
+        """
+        if self.passthrough:
+            return b""
+        return self.process(bytes((len(self._history) // 2 + 1) * 2))
+
+
+class FrameChunker:
+    """Re-chunks a byte stream into fixed-size frames.
+
+    Incoming chunks of any size are appended; ``push()`` returns every
+    complete frame, and ``flush()`` the remainder at the end of a session.
+    """
+
+    def __init__(self, frame_bytes: int) -> None:
+        self._frame_bytes = frame_bytes
+        self._buf = bytearray()
+
+    def push(self, data: bytes) -> list[bytes]:
+        self._buf += data
+        n = len(self._buf) // self._frame_bytes
+        if n == 0:
+            return []
+        cut = n * self._frame_bytes
+        view = memoryview(self._buf)
+        frames = [bytes(view[i:i + self._frame_bytes]) for i in range(0, cut, self._frame_bytes)]
+        view.release()
+        del self._buf[:cut]
+        return frames
+
+    def flush(self) -> bytes:
+        data, self._buf = bytes(self._buf), bytearray()
+        return data
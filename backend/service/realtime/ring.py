@@ -0,0 +1,46 @@
+class AudioRingBuffer:
+    """Fixed-size ring of the most recent PCM bytes of a session.
+
+    Storage is a single preallocated ``bytearray``; writes copy into it
+    through a ``memoryview`` and reads hand out ``memoryview`` slices, so
+    nothing is allocated per frame. Positions are absolute byte offsets
+    since the session started: ``start`` is the oldest byte still held and
+    ``end`` the next byte to be written.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = max(capacity, 1)
+        self._buf = bytearray(self._capacity)
+        self._view = memoryview(self._buf)
+        self.end = 0
+
+    @property
+    def start(self) -> int:
+        return max(0, self.end - self._capacity)
+
+    def write(self, data: bytes) -> None:
+        src = memoryview(data)
+        if len(src) > self._capacity:
+            # Only the tail fits; keep absolute positions consistent.
+            self.end += len(src) - self._capacity
+            src = src[-self._capacity:]
+        offset = self.end % self._capacity
+        first = min(len(src), self._capacity - offset)
+        self._view[offset:offset + first] = src[:first]
+        if first < len(src):
+            self._view[:len(src) - first] = src[first:]
+        self.end += len(src)
+
+    def read(self, position: int, max_bytes: int) -> memoryview:
+        """Return up to ``max_bytes`` contiguous bytes starting at ``position``.
+
+        The slice stops at the physical end of the ring, so callers loop
+        until ``position`` reaches ``end``. ``position`` must be within
+        ``[start, end)``. The returned view is only valid until the next
+        ``write``.
+        """
+        if not self.start <= position < self.end:
+            raise ValueError(f"Position {position} outside buffered range [{self.start}, {self.end})")
+        offset = position % self._capacity
+        length = min(max_bytes, self.end - position, self._capacity - offset)
+        return self._view[offset:offset + length]
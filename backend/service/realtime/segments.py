@@ -0,0 +1,82 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+def split_segments(transcript: str, max_chars: int) -> list[str]:
+    """Split a transcript into consecutive segments of roughly ``max_chars``.
+
+    Segments are built greedily from line boundaries, starting at the
+    beginning of the transcript, so appending text only ever changes the
+    last segment. Lines longer than ``max_chars`` are split on whitespace.
+    """
+    segments: list[str] = []
+    current: list[str] = []
+    current_len = 0
+
+    def _lines():
+        for line in transcript.splitlines():
+            while len(line) > max_chars:
+                cut = line.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                yield line[:cut]
+                line = line[cut:].lstrip()
+            yield line
+
+    for line in _lines():
+        if current and current_len + len(line) + 1 > max_chars:
+            segments.append("\n".join(current))
+            current, current_len = [], 0
+        current.append(line)
+        current_len += len(line) + 1
+    if current:
+        segments.append("\n".join(current))
+    return segments
+
+
+def segment_key(fingerprint: str, segment: str) -> str:
+    """Cache key for a segment summary produced under a given model/language fingerprint."""
+    return hashlib.sha256(f"{fingerprint}\0{segment}".encode("utf-8")).hexdigest()
+
+
+class SegmentSummaryCache:
+    """Per-session cache of summaries for closed transcript segments.
+
+    Sessions are evicted after ``ttl_seconds`` without access, and the least
+    recently used session is dropped once ``max_sessions`` is exceeded.
+    """
+
+    def __init__(self, max_sessions: int = 200, ttl_seconds: float = 4 * 3600) -> None:
+        self._sessions: OrderedDict[str, dict[str, str]] = OrderedDict()
+        self._last_access: dict[str, float] = {}
+        self._max_sessions = max_sessions
+        self._ttl_seconds = ttl_seconds
+
+    def get(self, session_id: str, key: str) -> str | None:
+        self._evict_expired()
+        entries = self._sessions.get(session_id)
+        if entries is None:
+            return None
+        self._touch(session_id)
+        return entries.get(key)
+
+    def put(self, session_id: str, key: str, summary: str) -> None:
+        self._sessions.setdefault(session_id, {})[key] = summary
+        self._touch(session_id)
+        while len(self._sessions) > self._max_sessions:
+            oldest, _ = self._sessions.popitem(last=False)
+            self._last_access.pop(oldest, None)
+
+    def clear(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+
+    def _touch(self, session_id: str) -> None:
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self._ttl_seconds
+        for sid in [s for s, t in self._last_access.items() if t < cutoff]:
+            self.clear(sid)
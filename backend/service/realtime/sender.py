@@ -0,0 +1,180 @@
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
+from fastapi import WebSocket
+
+from service.realtime.delta import PartialDeltaEncoder
+from utils.logging import logger
+
+if TYPE_CHECKING:
+    from service.realtime.metrics import RelayMetrics
+
+
+class BrowserSender:
+    """Bounded outbound queue drained by a dedicated sender task.
+
+    Decouples reading from AssemblyAI from writing to a (possibly slow)
+    browser connection. Finals and control messages are always delivered
+    in order. Partials are supersedable: a newer partial replaces any
+    partial still waiting in the queue, and partials are dropped outright
+    while the queue is full.
+
+    Throttled partials are additionally rate limited to
+    ``max_partials_per_second``: within the interval only the latest one is
+    held back and emitted when the interval elapses (trailing edge), so the
+    browser always ends up with the newest text.
+
+    When an ``encoder`` is given (delta protocol), messages are encoded
+    right before they are written, after all dropping and coalescing.
+    With ``metrics``, the time from queuing to writing each message is
+    recorded in its event latency histogram.
+    """
+
+    def __init__(
+        self, ws: WebSocket, max_queue: int = 256, max_partials_per_second: float = 0,
+        encoder: PartialDeltaEncoder | None = None, metrics: "RelayMetrics | None" = None,
+    ) -> None:
+        self._ws = ws
+        self._encoder = encoder
+        self._metrics = metrics
+        self._max_queue = max_queue
+        self._min_partial_interval = 1 / max_partials_per_second if max_partials_per_second > 0 else 0.0
+        # Entries are [message, queued_at] lists so a queued partial can be
+        # voided or replaced in place.
+        self._queue: deque[list] = deque()
+        self._pending_partial: list | None = None
+        self._held_partial: dict | None = None
+        self._held_deadline = 0.0
+        self._last_partial_at = float("-inf")
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self.failed = False
+        self.sent_messages = 0
+        self.dropped_partials = 0
+        self.coalesced_partials = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def send(self, message: dict) -> None:
+        """Queue a message that must never be dropped (finals, control, errors)."""
+        if self.failed or self._closing:
+            return
+        if message.get("is_final") and self._held_partial is not None:
+            # A final covers everything a held-back partial could show.
+            self._held_partial = None
+            self.coalesced_partials += 1
+        self._enqueue([message, asyncio.get_running_loop().time()])
+
+    def send_partial(self, message: dict, throttle: bool = False) -> None:
+        """Queue a partial, superseding any partial that has not been sent yet.
+
+        With ``throttle=True`` the partial is subject to the rate limit.
+        Unthrottled partials are sent immediately and replace a held-back one.
+        """
+        if self.failed or self._closing:
+            return
+        now = asyncio.get_running_loop().time()
+        if self._held_partial is not None:
+            self._held_partial = None
+            self.coalesced_partials += 1
+        if throttle and now - self._last_partial_at < self._min_partial_interval:
+            self._held_partial = message
+            self._held_deadline = self._last_partial_at + self._min_partial_interval
+            self._wakeup.set()
+            return
+        self._last_partial_at = now
+        self._queue_partial(message)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "sent_messages": self.sent_messages,
+            "dropped_partials": self.dropped_partials,
+            "coalesced_partials": self.coalesced_partials,
+        }
+
+    async def close(self, timeout: float = 2.0) -> None:
+        """Stop accepting messages and drain what is queued, up to ``timeout`` seconds."""
+        self._closing = True
+        self._held_partial = None
+        self._wakeup.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._task.cancel()
+        except Exception:
+            pass
+
+    def _queue_partial(self, message: dict) -> None:
+        if self._pending_partial is not None:
+            self.dropped_partials += 1
+            if self._queue and self._queue[-1] is self._pending_partial:
+                # Nothing queued after it: overwrite in place, order is preserved.
+                self._pending_partial[0] = message
+                self._pending_partial[1] = asyncio.get_running_loop().time()
+                return
+            self._pending_partial[0] = None
+        elif len(self._queue) >= self._max_queue:
+            self.dropped_partials += 1
+            return
+        entry = [message, asyncio.get_running_loop().time()]
+        self._pending_partial = entry
+        self._enqueue(entry)
+
+    def _enqueue(self, entry: list) -> None:
+        self._queue.append(entry)
+        if len(self._queue) > self.max_queue_depth:
+            self.max_queue_depth = len(self._queue)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._held_partial is not None and loop.time() >= self._held_deadline:
+                message, self._held_partial = self._held_partial, None
+                self._last_partial_at = loop.time()
+                self._queue_partial(message)
+            if not self._queue:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                timeout = None
+                if self._held_partial is not None:
+                    timeout = max(0.0, self._held_deadline - loop.time())
+                try:
+                    async with asyncio.timeout(timeout):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                continue
+            entry = self._queue.popleft()
+            if entry is self._pending_partial:
+                self._pending_partial = None
+            message = entry[0]
+            if message is None:
+                continue
+            if self._encoder is not None:
+                message = self._encoder.encode(message)
+            try:
+                await self._ws.send_json(message)
+                self.sent_messages += 1
+                if self._metrics is not None:
+                    self._metrics.event_latency.observe((loop.time() - entry[1]) * 1000)
+            except Exception as e:
+                logger.debug(f"Browser send failed, stopping sender: {e}")
+                self.failed = True
+                self._queue.clear()
+                self._pending_partial = None
+                return
@@ -1,45 +1,215 @@
 import asyncio
+import hashlib
+import secrets
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from service.realtime.registry import SessionRecord, SessionRegistry
+
+if TYPE_CHECKING:
+    from service.realtime.broadcast import SessionBroadcast
+    from service.realtime.metrics import RelayMetrics
+    from service.realtime.persistence import TurnStore
+    from service.realtime.sender import BrowserSender
+    from service.realtime.vad import VoiceActivityGate
+
+TAKEOVER_WAIT_SECONDS = 5  # how long a reconnect waits for the previous connection of its id to end
+
+
+class SessionInUseError(Exception):
+    """Raised when a session id is still being streamed by another connection."""
+
+
+class SessionAccessError(Exception):
+    """Raised when a session id belongs to another AssemblyAI key."""
+
+
+def api_key_hash(api_key: str) -> str:
+    """What is kept of the AssemblyAI key that owns a session or capture."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TranscriptTurn:
+    index: int
+    text: str
+    speaker_label: str
+    start_ms: int
+    end_ms: int
+
+
+@dataclass
+class TranscriptSnapshot:
+    live: bool
+    turns: list[TranscriptTurn]
+    next_turn: int
+    current_partial: str = ""
 
 
 @dataclass
 class SessionState:
     session_id: str
+    key_hash: str = ""
+    # Handed to the streaming connection, which shares it with read-only viewers
+    viewer_token: str = field(default_factory=lambda: secrets.token_urlsafe(16))
     accumulated_transcript: str = ""
     current_partial: str = ""
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     last_activity: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     start_monotonic: float = field(default_factory=time.monotonic)
+    turns: list[TranscriptTurn] = field(default_factory=list)
+    # Session time already covered by turns restored from persistence
+    resumed_offset_ms: int = 0
+    sender: "BrowserSender | None" = None
+    broadcast: "SessionBroadcast | None" = None
+    metrics: "RelayMetrics | None" = None
+    vad: "VoiceActivityGate | None" = None
+    claim_id: str = ""
+    ended: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
 
     def elapsed_ms(self) -> int:
         """Wall-clock milliseconds since session start."""
         return int((time.monotonic() - self.start_monotonic) * 1000)
 
+    def can_view(self, viewer_token: str | None, api_key: str | None) -> bool:
+        """Whether a subscriber presents the session's viewer token or its owner's key."""
+        if viewer_token and secrets.compare_digest(viewer_token, self.viewer_token):
+            return True
+        return bool(api_key) and secrets.compare_digest(api_key_hash(api_key), self.key_hash)
+
+    def snapshot(self, from_turn: int = 0) -> TranscriptSnapshot:
+        """Turns from ``from_turn`` on plus the current partial."""
+        return TranscriptSnapshot(
+            live=True,
+            turns=[t for t in self.turns if t.index >= from_turn],
+            next_turn=self.turns[-1].index + 1 if self.turns else 0,
+            current_partial=self.current_partial,
+        )
+
 
 class SessionManager:
-    def __init__(self) -> None:
+    """Live state of the realtime sessions owned by this worker.
+
+    Ownership is also recorded in ``registry`` so other workers can find
+    out who owns a session (and its last published stats) by id. With a
+    ``turn_store`` finalized turns are persisted, and a session id that is
+    created again (reconnect, reload, restart) resumes from its saved turns.
+
+    A session id is streamed by one connection at a time: a reconnect
+    whose previous connection has not noticed the drop yet waits up to
+    ``TAKEOVER_WAIT_SECONDS`` for it to end, so turns are never numbered
+    by two relays at once.
+
+    Sessions are owned by the AssemblyAI key that created them (kept as a
+    hash): resuming a session id or reading its transcript requires the
+    same key.
+    """
+
+    def __init__(self, registry: SessionRegistry | None = None, turn_store: "TurnStore | None" = None) -> None:
         self._sessions: dict[str, SessionState] = {}
         self._lock = asyncio.Lock()
+        self._registry = registry or SessionRegistry()
+        self._turn_store = turn_store
 
-    async def create_session(self, session_id: str) -> SessionState:
-        async with self._lock:
-            session = SessionState(session_id=session_id)
-            self._sessions[session_id] = session
-            return session
+    async def create_session(self, session_id: str, key_hash: str) -> SessionState:
+        """Start streaming ``session_id`` on this worker for the key with hash ``key_hash``.
+
+        Raises ``SessionInUseError`` if another connection still streams it
+        and ``SessionAccessError`` if it belongs to another key.
+        """
+        try:
+            async with asyncio.timeout(TAKEOVER_WAIT_SECONDS):
+                while True:
+                    async with self._lock:
+                        previous = self._sessions.get(session_id)
+                        if previous is None:
+                            session = SessionState(session_id=session_id, key_hash=key_hash)
+                            self._sessions[session_id] = session
+                            break
+                    if previous.key_hash != key_hash:
+                        raise SessionAccessError(f"Session {session_id} belongs to another AssemblyAI key")
+                    await previous.ended.wait()
+        except TimeoutError:
+            raise SessionInUseError(f"Session {session_id} is still live on another connection") from None
+
+        try:
+            claim_id = await self._registry.claim(session_id, key_hash)
+            if claim_id is None:
+                record = await self._registry.lookup(session_id)
+                owner = f" ({record.owner})" if record is not None else ""
+                raise SessionInUseError(f"Session {session_id} is live on another worker{owner}")
+            session.claim_id = claim_id
+            owner, turns = await self._turn_store.load(session_id) if self._turn_store else ("", [])
+            if turns and owner != key_hash:
+                raise SessionAccessError(f"Session {session_id} belongs to another AssemblyAI key")
+        except BaseException:
+            await self.remove_session(session)
+            raise
+        if turns:
+            session.turns = turns
+            session.accumulated_transcript = "".join(t.text + " " for t in turns)
+            session.resumed_offset_ms = turns[-1].end_ms
+            # Continue the wall clock where the restored transcript ends
+            session.start_monotonic -= turns[-1].end_ms / 1000
+        return session
 
     async def get_session(self, session_id: str) -> SessionState | None:
         async with self._lock:
             return self._sessions.get(session_id)
 
-    async def append_final_text(self, session_id: str, text: str) -> None:
+    async def snapshot(self, session_id: str, key_hash: str, from_turn: int = 0) -> TranscriptSnapshot | None:
+        """Turns from ``from_turn`` on plus the current partial.
+
+        Served from the live session when this worker owns it, otherwise
+        from persisted turns (if persistence is enabled). ``None`` unless
+        the session belongs to the key with hash ``key_hash``.
+        """
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                return session.snapshot(from_turn) if session.key_hash == key_hash else None
+        if self._turn_store is None:
+            return None
+        owner, saved = await self._turn_store.load(session_id)
+        if not saved or owner != key_hash:
+            return None
+        return TranscriptSnapshot(
+            live=False, turns=[t for t in saved if t.index >= from_turn], next_turn=saved[-1].index + 1)
+
+    async def lookup(self, session_id: str) -> SessionRecord | None:
+        """Find a live session owned by any worker."""
+        return await self._registry.lookup(session_id)
+
+    async def heartbeat(self, session_id: str, stats: dict) -> None:
+        """Refresh this worker's ownership record with a stats snapshot."""
+        async with self._lock:
+            session = self._sessions.get(session_id)
+        if session is not None:
+            await self._registry.heartbeat(session_id, session.claim_id, stats)
+
+    async def append_turn(
+        self, session_id: str, text: str, speaker_label: str, start_ms: int, end_ms: int,
+    ) -> TranscriptTurn | None:
+        """Record a finalized turn (and queue it for persistence)."""
         async with self._lock:
             session = self._sessions.get(session_id)
             if session is None:
-                return
-            session.accumulated_transcript += text
+                return None
+            turn = TranscriptTurn(
+                index=session.turns[-1].index + 1 if session.turns else 0,
+                text=text,
+                speaker_label=speaker_label,
+                start_ms=start_ms,
+                end_ms=end_ms,
+            )
+            session.turns.append(turn)
+            session.accumulated_transcript += text + " "
             session.last_activity = datetime.now(timezone.utc)
+        if self._turn_store:
+            self._turn_store.append(session_id, session.key_hash, turn)
+        return turn
 
     async def update_partial(self, session_id: str, text: str) -> None:
         async with self._lock:
@@ -49,6 +219,30 @@ class SessionManager:
             session.current_partial = text
             session.last_activity = datetime.now(timezone.utc)
 
+    async def attach_sender(self, session_id: str, sender: "BrowserSender") -> None:
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.sender = sender
+
+    async def attach_broadcast(self, session_id: str, broadcast: "SessionBroadcast") -> None:
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.broadcast = broadcast
+
+    async def attach_metrics(self, session_id: str, metrics: "RelayMetrics") -> None:
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.metrics = metrics
+
+    async def attach_vad(self, session_id: str, vad: "VoiceActivityGate") -> None:
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.vad = vad
+
     async def elapsed_ms(self, session_id: str) -> int:
         async with self._lock:
             session = self._sessions.get(session_id)
@@ -56,9 +250,14 @@ class SessionManager:
                 return 0
             return session.elapsed_ms()
 
-    async def remove_session(self, session_id: str) -> None:
+    async def remove_session(self, session: SessionState) -> None:
+        """End ``session``; a newer session with the same id is left alone."""
         async with self._lock:
-            self._sessions.pop(session_id, None)
+            if self._sessions.get(session.session_id) is session:
+                del self._sessions[session.session_id]
+        session.ended.set()
+        if session.claim_id:
+            await self._registry.release(session.session_id, session.claim_id)
 
     async def cleanup_stale_sessions(self, max_age_hours: int = 4) -> None:
         async with self._lock:
@@ -69,4 +268,4 @@ class SessionManager:
                 if (now - session.created_at).total_seconds() > max_age_hours * 3600
             ]
             for sid in stale_ids:
-                del self._sessions[sid]
+                self._sessions.pop(sid).ended.set()
@@ -0,0 +1,443 @@
+import asyncio
+import json
+import re
+from typing import AsyncGenerator, Literal, Union
+
+from langdetect import LangDetectException, detect
+from pydantic import BaseModel as PydanticBaseModel, Field as PydanticField
+from pydantic_ai import Agent
+from pydantic_ai.settings import ModelSettings
+
+from config import config
+from models.llm import LLMProvider
+from models.realtime import IncrementalSummaryRequest, IncrementalUpdateMode
+from service.llm.core import LLMService
+from service.realtime.segments import SegmentSummaryCache, segment_key, split_segments
+from utils.logging import logger
+
+# --- Language detection ---
+
+_LANG_CODE_MAP: dict[str, str] = {
+    "en": "English",
+    "de": "German",
+    "fr": "French",
+    "es": "Spanish",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "nl": "Dutch",
+    "pl": "Polish",
+    "ru": "Russian",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "ar": "Arabic",
+    "tr": "Turkish",
+    "sv": "Swedish",
+    "da": "Danish",
+    "fi": "Finnish",
+    "cs": "Czech",
+    "sk": "Slovak",
+    "hu": "Hungarian",
+    "ro": "Romanian",
+    "uk": "Ukrainian",
+    "zh-cn": "Chinese",
+    "zh-tw": "Chinese (Traditional)",
+}
+
+
+def _detect_language_sync(text: str) -> str:
+    try:
+        code = detect(text)
+        return _LANG_CODE_MAP.get(code, "English")
+    except LangDetectException:
+        return "English"
+
+
+async def _detect_language(text: str) -> str:
+    return await asyncio.to_thread(_detect_language_sync, text)
+
+
+# --- Patch-based updates ---
+
+class _SectionEdit(PydanticBaseModel):
+    op: Literal["replace", "append", "delete"] = PydanticField(
+        ..., description="'replace' rewrites the section body, 'append' adds text to the end of the section body, 'delete' removes the section")
+    heading: str = PydanticField(
+        ..., description="Exact heading line of the target section as it appears in the current summary (e.g. '## Action Items'). For a new section, the heading line to create.")
+    content: str = PydanticField(
+        "", description="New section body for 'replace', text to add for 'append', empty for 'delete'")
+
+
+class _SummaryPatch(PydanticBaseModel):
+    edits: list[_SectionEdit] = PydanticField(
+        default_factory=list, description="Section-level edits to apply. Empty when the summary needs no change.")
+
+
+_PATCH_INSTRUCTIONS = (
+    "\n\nYou are updating an existing summary. Do NOT re-emit the summary. "
+    "Return only the section-level edits needed to incorporate the new transcript. "
+    "Sections are delimited by Markdown heading lines and identified by their exact heading line. "
+    "Prefer 'append' for adding new points to an existing section; use 'replace' only when existing "
+    "content in that section must change; use 'delete' only for sections that are no longer accurate. "
+    "Targeting a heading that does not exist yet creates a new section at the end. "
+    "Return an empty list of edits if nothing needs to change."
+)
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+\S")
+# Speaker labels as the relay emits them ("Speaker A:", "Speaker AB:", "Speaker UNKNOWN:")
+_SPEAKER_PREFIX_RE = re.compile(r"^\s*Speaker (?:[A-Z]{1,2}|UNKNOWN):\s*", re.MULTILINE)
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_FILLER_WORDS = {
+    "ah", "aha", "äh", "ähm", "eh", "hm", "hmm", "mhm", "mm", "oh", "ok", "okay",
+    "uh", "uhm", "um", "umm", "ja", "jo", "nee", "nein", "no", "yeah", "yes", "yep",
+}
+_MIN_MEANINGFUL_WORDS = 5
+
+
+def _has_meaningful_content(chunk: str | None) -> bool:
+    """Return True if the chunk contains enough non-filler words to affect a summary."""
+    if not chunk:
+        return False
+    text = _SPEAKER_PREFIX_RE.sub("", chunk)
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _FILLER_WORDS]
+    return len(words) >= _MIN_MEANINGFUL_WORDS
+
+
+def _normalize_heading(heading: str) -> str:
+    return heading.strip().lstrip("#").strip().rstrip(":").casefold()
+
+
+def _heading_level(heading: str) -> int:
+    """Markdown heading level; 0 for the untitled text before the first heading."""
+    match = _HEADING_RE.match(heading)
+    return len(match.group(1)) if match else 0
+
+
+def _split_sections(summary: str) -> list[list[str]]:
+    """Split a Markdown summary into [heading, body] pairs.
+
+    Text before the first heading is kept as a section with an empty heading.
+    Heading-like lines inside fenced code blocks are not treated as headings.
+    Sections stay flat; ``_subtree_end`` finds where a section's children end.
+    """
+    sections: list[list[str]] = [["", ""]]
+    body_lines: list[str] = []
+    in_fence = False
+    for line in summary.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and _HEADING_RE.match(line):
+            sections[-1][1] = "\n".join(body_lines)
+            sections.append([line, ""])
+            body_lines = []
+        else:
+            body_lines.append(line)
+    sections[-1][1] = "\n".join(body_lines)
+    if not sections[0][1].strip():
+        sections.pop(0)
+    return sections
+
+
+def _subtree_end(sections: list[list[str]], index: int) -> int:
+    """Index after the section at ``index`` and all of its subsections.
+
+    A section runs until the next heading of the same or a higher level.
+    """
+    level = _heading_level(sections[index][0])
+    end = index + 1
+    if level:
+        while end < len(sections) and _heading_level(sections[end][0]) > level:
+            end += 1
+    return end
+
+
+def _find_sections(sections: list[list[str]], heading: str) -> list[int]:
+    """Indexes of the sections an edit may target.
+
+    Sections with the exact heading line if there are any, otherwise those
+    with the same heading text regardless of level and trailing colon.
+    """
+    line = heading.strip()
+    exact = [i for i, (h, _) in enumerate(sections) if h and h.strip() == line]
+    if exact:
+        return exact[:1]
+    key = _normalize_heading(heading)
+    return [i for i, (h, _) in enumerate(sections) if h and _normalize_heading(h) == key]
+
+
+def _join_sections(sections: list[list[str]]) -> str:
+    blocks = []
+    for heading, body in sections:
+        body = body.strip("\n")
+        if heading and body:
+            blocks.append(f"{heading}\n{body}")
+        else:
+            blocks.append(heading or body)
+    return "\n\n".join(blocks) + "\n"
+
+
+def _apply_edits(summary: str, edits: list[_SectionEdit]) -> str:
+    """Apply section-level edits to a Markdown summary.
+
+    ``delete`` removes a section with its subsections. ``replace`` rewrites
+    the section body; if the new content has headings of its own it
+    replaces the subsections too. ``append`` adds to the section's own body.
+    """
+    sections = _split_sections(summary)
+    for edit in edits:
+        matches = _find_sections(sections, edit.heading)
+        if len(matches) > 1:
+            logger.warning(f"Summary edit skipped: heading {edit.heading!r} matches {len(matches)} sections")
+            continue
+        index = matches[0] if matches else None
+        if edit.op == "delete":
+            if index is not None:
+                del sections[index:_subtree_end(sections, index)]
+            continue
+        if index is None:
+            heading = edit.heading.strip()
+            if not heading.startswith("#"):
+                heading = f"## {heading}"
+            sections.extend(_replaced(heading, edit.content))
+        elif edit.op == "replace":
+            replacement = _replaced(sections[index][0], edit.content)
+            if len(replacement) > 1:
+                sections[index:_subtree_end(sections, index)] = replacement
+            else:
+                sections[index][1] = replacement[0][1]
+        else:
+            target = sections[index]
+            target[1] = target[1].rstrip() + "\n" + edit.content.strip("\n")
+    return _join_sections(sections)
+
+
+def _replaced(heading: str, content: str) -> list[list[str]]:
+    """The section ``heading`` with ``content`` as body, split at any headings ``content`` contains.
+
+    A copy of ``heading`` itself at the start of ``content`` is not repeated.
+    """
+    parts = _split_sections(content)
+    body = ""
+    if parts and not parts[0][0]:
+        body = parts.pop(0)[1]
+    if not body.strip() and parts and _normalize_heading(parts[0][0]) == _normalize_heading(heading):
+        body = parts.pop(0)[1]
+    return [[heading, body], *parts]
+
+
+# --- Hierarchical summaries ---
+
+_SEGMENT_SYSTEM_PROMPT = (
+    "You condense one part of a longer meeting transcript into compact notes. "
+    "Write concise bullet points in {language}. Keep every decision, action item "
+    "(with owner and due date), open question, number and name. Do not add an "
+    "introduction or a conclusion."
+)
+
+
+async def _static_stream(
+    text: str, title: str | None = None, usage: object | None = None,
+) -> AsyncGenerator[str, None]:
+    """Emit an already complete summary using the streaming marker protocol."""
+    if title is not None:
+        clean_title = title.replace("\n", " ").strip()
+        yield f"<!--SUMMARY_TITLE:{clean_title}-->\n"
+    yield text
+    if usage is not None:
+        input_tokens = getattr(usage, "request_tokens", 0) or 0
+        output_tokens = getattr(usage, "response_tokens", 0) or 0
+        usage_data = json.dumps({
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+        yield f"\n\n<!--TOKEN_USAGE:{usage_data}-->"
+
+
+class IncrementalSummaryService:
+    def __init__(self, llm_service: LLMService | None = None) -> None:
+        self._llm_service = llm_service or LLMService()
+        self._segment_cache = SegmentSummaryCache()
+
+    async def generate(
+        self, request: IncrementalSummaryRequest
+    ) -> Union[tuple, AsyncGenerator[str, None]]:
+        """Generate or update a realtime summary.
+
+        Returns:
+            Streaming: async generator of string chunks using the same marker
+            protocol as ``/createSummary`` (title marker + body + usage marker).
+            Non-streaming: tuple of (summary_title, output_text, usage, unchanged).
+        """
+        is_patch = (
+            request.update_mode == IncrementalUpdateMode.PATCH
+            and not request.is_full_recompute
+            and request.previous_summary is not None
+        )
+
+        # Nothing worth summarizing arrived since the last tick: skip the LLM entirely.
+        if is_patch and not _has_meaningful_content(request.new_transcript_chunk):
+            if request.stream:
+                return _static_stream(request.previous_summary)
+            return None, request.previous_summary, None, True
+
+        model_name = request.model
+        if request.provider == LLMProvider.AZURE_OPENAI and request.azure_config:
+            model_name = request.azure_config.deployment_name
+
+        model = self._llm_service._create_model(
+            provider=request.provider,
+            model_name=model_name,
+            api_key=request.api_key,
+            azure_config=request.azure_config,
+            langdock_config=request.langdock_config,
+        )
+
+        # Detect language from the transcript; substitute {language} in the prompt
+        language = await _detect_language(request.full_transcript)
+        system_prompt = request.system_prompt.replace("{language}", language)
+
+        if is_patch:
+            return await self._generate_patch(request, model, model_name, language, system_prompt)
+
+        user_prompt = None
+        segment_usage = None
+        is_full = request.is_full_recompute or request.previous_summary is None
+        if is_full and request.hierarchical and request.session_id:
+            user_prompt, segment_usage = await self._build_hierarchical_prompt(
+                request, model, language)
+
+        # Build user prompt based on mode (hierarchical mode already built one)
+        if user_prompt is None and is_full:
+            user_prompt = (
+                f"Create a structured summary of the following transcript:\n\n"
+                f"{request.full_transcript}"
+            )
+        elif user_prompt is None:
+            user_prompt = (
+                f"Current summary:\n{request.previous_summary}\n\n"
+                f"New transcript (only update sections directly relevant to this):\n"
+                f"{request.new_transcript_chunk}\n\n"
+                f"Update the summary. Preserve all unchanged sections verbatim."
+            )
+
+        agent = Agent(
+            model,
+            system_prompt=system_prompt,
+            model_settings=ModelSettings(temperature=0.1),
+        )
+
+        if request.stream:
+            # The title marker must precede the body, so generate it first.
+            title, title_usage = await self._generate_title(
+                model, request, model_name, language)
+            if segment_usage is not None:
+                title_usage = segment_usage + title_usage if title_usage else segment_usage
+            return self._llm_service._stream_response(
+                agent, user_prompt, title=title, title_usage=title_usage)
+
+        result = await agent.run(user_prompt)
+        title, _ = await self._generate_title(model, request, model_name, language)
+        usage = result.usage()
+        if segment_usage is not None:
+            usage = usage + segment_usage
+        return title, result.output, usage, False
+
+    async def _build_hierarchical_prompt(
+        self, request: IncrementalSummaryRequest, model, language: str,
+    ) -> tuple[str | None, object | None]:
+        """Build a reduce prompt from cached summaries of closed transcript segments.
+
+        Every segment except the last is closed: its text can no longer change
+        as the transcript grows, so its summary is computed once per session and
+        reused. The open tail is passed verbatim to the reduce step.
+
+        Returns:
+            Tuple of (user_prompt, usage of newly summarized segments). The
+            prompt is None when the transcript is still a single segment.
+        """
+        segments = split_segments(request.full_transcript, config.realtime_segment_chars)
+        if len(segments) < 2:
+            return None, None
+        closed, tail = segments[:-1], segments[-1]
+
+        fingerprint = f"{request.provider.value}:{request.model}:{language}"
+        agent = Agent(
+            model,
+            system_prompt=_SEGMENT_SYSTEM_PROMPT.format(language=language),
+            model_settings=ModelSettings(temperature=0.1),
+        )
+        semaphore = asyncio.Semaphore(config.realtime_segment_concurrency)
+        usages = []
+
+        async def _summarize(index: int, segment: str) -> str:
+            key = segment_key(fingerprint, segment)
+            cached = self._segment_cache.get(request.session_id, key)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                result = await agent.run(
+                    f"Part {index + 1} of the transcript:\n\n{segment}")
+            usages.append(result.usage())
+            self._segment_cache.put(request.session_id, key, result.output)
+            return result.output
+
+        notes = await asyncio.gather(*(_summarize(i, seg) for i, seg in enumerate(closed)))
+        logger.info(
+            f"Hierarchical summary for session {request.session_id}: "
+            f"{len(closed)} closed segment(s), {len(usages)} newly summarized")
+
+        parts = "\n\n".join(
+            f"### Part {i + 1}\n{note.strip()}" for i, note in enumerate(notes))
+        user_prompt = (
+            f"Create a structured summary of the following meeting. The earlier parts "
+            f"of the transcript have been condensed into chronological notes; the most "
+            f"recent part follows verbatim.\n\n"
+            f"## Notes on earlier parts\n\n{parts}\n\n"
+            f"## Most recent transcript\n\n{tail}"
+        )
+        usage = None
+        for u in usages:
+            usage = u if usage is None else usage + u
+        return user_prompt, usage
+
+    async def _generate_patch(
+        self, request: IncrementalSummaryRequest, model, model_name: str,
+        language: str, system_prompt: str,
+    ) -> Union[tuple, AsyncGenerator[str, None]]:
+        """Ask the model for section-level edits and apply them to the previous summary."""
+        agent = Agent(
+            model,
+            system_prompt=system_prompt + _PATCH_INSTRUCTIONS,
+            output_type=_SummaryPatch,
+            model_settings=ModelSettings(temperature=0.1),
+        )
+        user_prompt = (
+            f"Current summary:\n{request.previous_summary}\n\n"
+            f"New transcript:\n{request.new_transcript_chunk}"
+        )
+        result = await agent.run(user_prompt)
+        edits = result.output.edits
+        logger.debug(f"Realtime summary patch: {len(edits)} edit(s)")
+
+        if edits:
+            summary = _apply_edits(request.previous_summary, edits)
+            title, _ = await self._generate_title(model, request, model_name, language)
+        else:
+            summary, title = request.previous_summary, None
+
+        if request.stream:
+            return _static_stream(summary, title=title, usage=result.usage())
+        return title, summary, result.usage(), not edits
+
+    async def _generate_title(
+        self, model, request: IncrementalSummaryRequest, model_name: str, language: str,
+    ) -> tuple[str | None, object | None]:
+        """Generate a dedicated title, returning (None, None) on failure."""
+        try:
+            return await self._llm_service._generate_title(
+                model, request.provider, model_name,
+                request.full_transcript, language, None,
+            )
+        except Exception as e:
+            logger.warning(f"Realtime title generation failed: {e}")
+            return None, None
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable
+
+
+class DeadlineTimer:
+    """Long-lived debounce timer driven by a movable deadline.
+
+    One task per timer runs for the lifetime of the owner. ``arm()`` only
+    stores a new deadline and wakes the loop when the deadline moves
+    earlier (or the timer was idle); pushing the deadline later is picked
+    up lazily when the current wait expires. No task or timer handle is
+    created per event.
+    """
+
+    def __init__(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._callback = callback
+        self._deadline: float | None = None
+        self._waiting_until: float | None = None
+        self._wakeup = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    def arm(self, delay: float) -> None:
+        """(Re)schedule the callback to run ``delay`` seconds from now."""
+        deadline = self._loop.time() + delay
+        wake = self._waiting_until is None or deadline < self._waiting_until
+        self._deadline = deadline
+        if wake:
+            self._wakeup.set()
+
+    def cancel(self) -> None:
+        """Disarm the timer; a wait in progress expires without firing."""
+        self._deadline = None
+
+    async def stop(self) -> None:
+        self._deadline = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            target = self._deadline
+            if target is None:
+                self._waiting_until = None
+                await self._wakeup.wait()
+                continue
+            if self._loop.time() < target:
+                self._waiting_until = target
+                try:
+                    async with asyncio.timeout_at(target):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                # Re-evaluate: the deadline may have moved or been cancelled.
+                continue
+            self._deadline = None
+            self._waiting_until = None
+            await self._callback()
@@ -0,0 +1,121 @@
+import bisect
+from collections import deque
+
+import numpy as np
+
+WINDOW_MS = 10
+MIN_SPEECH_WINDOWS = 2
+KEEPALIVE_MS = 5000
+
+
+class VoiceActivityGate:
+    """Energy-based voice activity gate for ``pcm_s16le`` mono frames.
+
+    Each frame is split into 10 ms windows and their RMS level (dBFS) is
+    computed in one vectorized pass; a frame counts as speech when at least
+    two windows reach ``threshold_dbfs``. Audio keeps flowing for
+    ``hangover_ms`` after the last speech frame so trailing syllables and
+    AssemblyAI's end-of-turn silence survive, and the last ``preroll_ms``
+    of gated audio is released in front of the next speech onset. During
+    long silences one frame every 5 s is still forwarded (thinning) so the
+    upstream session never sees a hard stop.
+
+    Gated audio shortens the timeline AssemblyAI sees; ``to_session_ms()``
+    maps a position on that forwarded timeline back to session time.
+    """
+
+    def __init__(
+        self, sample_rate: int, threshold_dbfs: float = -50.0,
+        hangover_ms: int = 1500, preroll_ms: int = 300,
+    ) -> None:
+        self._bytes_per_ms = sample_rate * 2 / 1000
+        self._window = max(int(sample_rate * WINDOW_MS / 1000), 1)
+        self._threshold = threshold_dbfs
+        self._hangover_ms = hangover_ms
+        self._preroll_ms = preroll_ms
+        self._preroll: deque[bytes] = deque()
+        self._preroll_bytes = 0
+        self._hangover_left_ms = 0.0
+        self._since_forward_ms = 0.0
+        self.total_ms = 0.0
+        self.forwarded_ms = 0.0
+        # (forwarded ms at gap, cumulative gated ms up to and including it)
+        self._gap_at: list[float] = []
+        self._gap_total: list[float] = []
+
+    @property
+    def gated_ms(self) -> float:
+        return self.total_ms - self.forwarded_ms - self._preroll_bytes / self._bytes_per_ms
+
+    def process(self, frame: bytes) -> list[bytes]:
+        """Return the frames to forward for one incoming frame (possibly none)."""
+        frame_ms = len(frame) / self._bytes_per_ms
+        self.total_ms += frame_ms
+
+        if self.is_speech(frame):
+            self._hangover_left_ms = self._hangover_ms
+            out = list(self._preroll)
+            out.append(frame)
+            self._preroll.clear()
+            self._preroll_bytes = 0
+            return self._forward(out)
+
+        if self._hangover_left_ms > 0:
+            self._hangover_left_ms -= frame_ms
+            return self._forward([frame])
+
+        if self._since_forward_ms + frame_ms >= KEEPALIVE_MS:
+            # Held pre-roll is older than this frame; drop it to keep order.
+            self._trim_preroll(0)
+            return self._forward([frame])
+        self._since_forward_ms += frame_ms
+
+        self._preroll.append(frame)
+        self._preroll_bytes += len(frame)
+        self._trim_preroll(self._preroll_ms)
+        return []
+
+    def is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2", count=len(frame) // 2)
+        n_windows = len(samples) // self._window
+        if n_windows == 0:
+            windows = samples.reshape(1, -1).astype(np.float32)
+        else:
+            windows = samples[: n_windows * self._window].reshape(n_windows, self._window).astype(np.float32)
+        if windows.size == 0:
+            return False
+        rms = np.sqrt(np.mean(windows * windows, axis=1))
+        dbfs = 20 * np.log10(rms / 32768.0 + 1e-10)
+        return int(np.count_nonzero(dbfs >= self._threshold)) >= min(MIN_SPEECH_WINDOWS, len(dbfs))
+
+    def to_session_ms(self, forwarded_ms: float) -> int:
+        """Map a position on the forwarded (gated) timeline to session time."""
+        i = bisect.bisect_right(self._gap_at, forwarded_ms) - 1
+        return int(forwarded_ms + (self._gap_total[i] if i >= 0 else 0))
+
+    def stats(self) -> dict:
+        return {
+            "audio_ms": int(self.total_ms),
+            "gated_audio_ms": int(max(self.gated_ms, 0)),
+        }
+
+    def _forward(self, frames: list[bytes]) -> list[bytes]:
+        self._since_forward_ms = 0.0
+        for frame in frames:
+            self.forwarded_ms += len(frame) / self._bytes_per_ms
+        return frames
+
+    def _trim_preroll(self, keep_ms: float) -> None:
+        while self._preroll and self._preroll_bytes / self._bytes_per_ms > keep_ms:
+            dropped = self._preroll.popleft()
+            self._preroll_bytes -= len(dropped)
+            self._record_gap(len(dropped) / self._bytes_per_ms)
+
+    def _record_gap(self, ms: float) -> None:
+        total = (self._gap_total[-1] if self._gap_total else 0.0) + ms
+        if self._gap_at and self._gap_at[-1] == self.forwarded_ms:
+            # Still the same silence run: extend it instead of adding a gap.
+            self._gap_total[-1] = total
+        else:
+            self._gap_at.append(self.forwarded_ms)
+            self._gap_total.append(total)
@@ -7,6 +7,9 @@ import type { ChatMessageType, ChatRequest, LLMProvider, AzureConfig, LangdockCo
 
 const WS_URL = process.env.NEXT_PUBLIC_BACKEND_WS_URL || "ws://localhost:8080";
 const MIC_STORAGE_KEY = "aias:v1:mic_device_id";
+// The backend trims history to a token budget and summarizes older turns;
+// this only caps the request size of very long conversations.
+const MAX_HISTORY_MESSAGES = 200;
 
 function getSavedMicId(): string {
   try {
@@ -200,11 +203,11 @@ export function useChatbot({
     const controller = new AbortController();
     abortRef.current = controller;
 
-    // Build messages for API (last 20) — strip action JSON from assistant messages
+    // Build messages for API — strip action JSON from assistant messages
     // and attach action outcome context to the NEXT user message (not the assistant
     // message itself, to prevent the LLM from mimicking status markers).
     const allMessages = [...messages, userMsg];
-    const trimmedMessages = allMessages.slice(-20);
+    const trimmedMessages = allMessages.slice(-MAX_HISTORY_MESSAGES);
     const apiMessages = trimmedMessages.map((m, i, arr) => {
       if (m.role === "assistant") {
         return { role: m.role, content: stripActionBlock(m.content) };